@@ -17,28 +17,37 @@ depends_on = None
 
 
 def upgrade() -> None:
+    # Each table's column and index are applied as one batch so SQLite can
+    # coalesce them instead of issuing separate ALTER/CREATE statements
+
     # Add wallet_address to conversations table
-    op.add_column('conversations', sa.Column('wallet_address', sa.String(), nullable=True))
-    op.create_index('ix_conversations_wallet_address', 'conversations', ['wallet_address'], unique=False)
-    
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.add_column(sa.Column('wallet_address', sa.String(), nullable=True))
+        batch_op.create_index('ix_conversations_wallet_address', ['wallet_address'], unique=False)
+
     # Add wallet_address to trading_rules table
-    op.add_column('trading_rules', sa.Column('wallet_address', sa.String(), nullable=True))
-    op.create_index('ix_trading_rules_wallet_address', 'trading_rules', ['wallet_address'], unique=False)
-    
+    with op.batch_alter_table('trading_rules') as batch_op:
+        batch_op.add_column(sa.Column('wallet_address', sa.String(), nullable=True))
+        batch_op.create_index('ix_trading_rules_wallet_address', ['wallet_address'], unique=False)
+
     # Add wallet_address to trades table
-    op.add_column('trades', sa.Column('wallet_address', sa.String(), nullable=True))
-    op.create_index('ix_trades_wallet_address', 'trades', ['wallet_address'], unique=False)
+    with op.batch_alter_table('trades') as batch_op:
+        batch_op.add_column(sa.Column('wallet_address', sa.String(), nullable=True))
+        batch_op.create_index('ix_trades_wallet_address', ['wallet_address'], unique=False)
 
 
 def downgrade() -> None:
     # Remove wallet_address from trades
-    op.drop_index('ix_trades_wallet_address', table_name='trades')
-    op.drop_column('trades', 'wallet_address')
-    
+    with op.batch_alter_table('trades') as batch_op:
+        batch_op.drop_index('ix_trades_wallet_address')
+        batch_op.drop_column('wallet_address')
+
     # Remove wallet_address from trading_rules
-    op.drop_index('ix_trading_rules_wallet_address', table_name='trading_rules')
-    op.drop_column('trading_rules', 'wallet_address')
-    
+    with op.batch_alter_table('trading_rules') as batch_op:
+        batch_op.drop_index('ix_trading_rules_wallet_address')
+        batch_op.drop_column('wallet_address')
+
     # Remove wallet_address from conversations
-    op.drop_index('ix_conversations_wallet_address', table_name='conversations')
-    op.drop_column('conversations', 'wallet_address')
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.drop_index('ix_conversations_wallet_address')
+        batch_op.drop_column('wallet_address')
@@ -0,0 +1,40 @@
+"""Replace wallet_address indexes with composite (wallet_address, status) indexes
+
+Revision ID: 007_wallet_status_indexes
+Revises: 006
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '007_wallet_status_indexes'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rules and pending trades are listed per wallet filtered by status; the
+    # composite index serves that as a range scan, and its wallet_address
+    # prefix still answers wallet-only lookups, so the old indexes are dropped.
+    op.create_index('ix_trading_rules_wallet_status', 'trading_rules', ['wallet_address', 'status'], unique=False)
+    op.drop_index('ix_trading_rules_wallet_address', table_name='trading_rules')
+
+    op.create_index('ix_pending_trades_wallet_status', 'pending_trades', ['wallet_address', 'status'], unique=False)
+    op.drop_index(op.f('ix_pending_trades_wallet_address'), table_name='pending_trades')
+
+    op.create_index('ix_trades_wallet_status', 'trades', ['wallet_address', 'status'], unique=False)
+    op.drop_index('ix_trades_wallet_address', table_name='trades')
+
+
+def downgrade() -> None:
+    op.create_index('ix_trades_wallet_address', 'trades', ['wallet_address'], unique=False)
+    op.drop_index('ix_trades_wallet_status', table_name='trades')
+
+    op.create_index(op.f('ix_pending_trades_wallet_address'), 'pending_trades', ['wallet_address'], unique=False)
+    op.drop_index('ix_pending_trades_wallet_status', table_name='pending_trades')
+
+    op.create_index('ix_trading_rules_wallet_address', 'trading_rules', ['wallet_address'], unique=False)
+    op.drop_index('ix_trading_rules_wallet_status', table_name='trading_rules')
@@ -0,0 +1,29 @@
+"""Index rule_id foreign keys on trades, job_logs and pending_trades
+
+Revision ID: 008_rule_id_indexes
+Revises: 007_wallet_status_indexes
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '008_rule_id_indexes'
+down_revision = '007_wallet_status_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Neither SQLite nor PostgreSQL index the referencing side of a foreign key,
+    # so rule detail pages and rule deletion were scanning these tables in full
+    op.create_index(op.f('ix_trades_rule_id'), 'trades', ['rule_id'], unique=False)
+    op.create_index(op.f('ix_job_logs_rule_id'), 'job_logs', ['rule_id'], unique=False)
+    op.create_index(op.f('ix_pending_trades_rule_id'), 'pending_trades', ['rule_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pending_trades_rule_id'), table_name='pending_trades')
+    op.drop_index(op.f('ix_job_logs_rule_id'), table_name='job_logs')
+    op.drop_index(op.f('ix_trades_rule_id'), table_name='trades')
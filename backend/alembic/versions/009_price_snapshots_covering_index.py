@@ -0,0 +1,35 @@
+"""Replace price_snapshots market/timestamp indexes with one covering index
+
+Revision ID: 009_price_snapshots_covering
+Revises: 008_rule_id_indexes
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '009_price_snapshots_covering'
+down_revision = '008_rule_id_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # "Latest price for a market" and "prices for a market in a time range" are
+    # both a single seek on (market, timestamp DESC); carrying price in the
+    # index means the table row never has to be read.
+    op.create_index(
+        'ix_price_snapshots_market_ts',
+        'price_snapshots',
+        ['market', sa.text('timestamp DESC'), 'price'],
+        unique=False,
+    )
+    op.drop_index(op.f('ix_price_snapshots_timestamp'), table_name='price_snapshots')
+    op.drop_index(op.f('ix_price_snapshots_market'), table_name='price_snapshots')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_price_snapshots_market'), 'price_snapshots', ['market'], unique=False)
+    op.create_index(op.f('ix_price_snapshots_timestamp'), 'price_snapshots', ['timestamp'], unique=False)
+    op.drop_index('ix_price_snapshots_market_ts', table_name='price_snapshots')
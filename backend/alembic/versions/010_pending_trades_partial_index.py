@@ -0,0 +1,35 @@
+"""Add partial index on pending_trades(wallet_address) for pending rows
+
+Revision ID: 010_pending_trades_partial
+Revises: 009_price_snapshots_covering
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '010_pending_trades_partial'
+down_revision = '009_price_snapshots_covering'
+branch_labels = None
+depends_on = None
+
+PENDING_ONLY = sa.text("status = 'pending'")
+
+
+def upgrade() -> None:
+    # The notification poll only asks for trades still awaiting approval; a
+    # partial index stays as small as the number of open requests instead of
+    # growing with every executed/rejected/expired trade.
+    op.create_index(
+        'ix_pending_trades_wallet_pending',
+        'pending_trades',
+        ['wallet_address'],
+        unique=False,
+        sqlite_where=PENDING_ONLY,
+        postgresql_where=PENDING_ONLY,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pending_trades_wallet_pending', table_name='pending_trades')
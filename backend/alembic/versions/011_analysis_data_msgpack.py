@@ -0,0 +1,51 @@
+"""Store trading_rules.analysis_data as zstd-compressed msgpack
+
+Revision ID: 011_analysis_data_msgpack
+Revises: 010_pending_trades_partial
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import msgpack
+import zstandard
+
+
+revision = '011_analysis_data_msgpack'
+down_revision = '010_pending_trades_partial'
+branch_labels = None
+depends_on = None
+
+
+def _convert(source_type, target_type, encode) -> None:
+    """Copy analysis_data into a column of target_type, then swap the columns."""
+    op.add_column('trading_rules', sa.Column('analysis_data_new', target_type, nullable=True))
+
+    rules = sa.table(
+        'trading_rules',
+        sa.column('id', sa.Integer()),
+        sa.column('analysis_data', source_type),
+        sa.column('analysis_data_new', target_type),
+    )
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(rules.c.id, rules.c.analysis_data).where(rules.c.analysis_data.isnot(None))
+    ).all()
+    for rule_id, value in rows:
+        conn.execute(
+            rules.update().where(rules.c.id == rule_id).values(analysis_data_new=encode(value))
+        )
+
+    with op.batch_alter_table('trading_rules') as batch_op:
+        batch_op.drop_column('analysis_data')
+        batch_op.alter_column('analysis_data_new', new_column_name='analysis_data')
+
+
+def upgrade() -> None:
+    # JSON is stored as text and re-parsed on every read; the packed form is
+    # smaller on disk and much cheaper to (de)serialize
+    _convert(sa.JSON(), sa.LargeBinary(), lambda value: zstandard.compress(msgpack.packb(value)))
+
+
+def downgrade() -> None:
+    _convert(sa.LargeBinary(), sa.JSON(), lambda value: msgpack.unpackb(zstandard.decompress(value)))
@@ -0,0 +1,34 @@
+"""Add partial index on trading_rules(market, wallet_address) for active rules
+
+Revision ID: 012_trading_rules_active
+Revises: 011_analysis_data_msgpack
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '012_trading_rules_active'
+down_revision = '011_analysis_data_msgpack'
+branch_labels = None
+depends_on = None
+
+ACTIVE_ONLY = sa.text("status = 'active'")
+
+
+def upgrade() -> None:
+    # The scheduler only restores and monitors active rules; indexing just
+    # those keeps the lookup proportional to active rules, not rule history
+    op.create_index(
+        'ix_trading_rules_active',
+        'trading_rules',
+        ['market', 'wallet_address'],
+        unique=False,
+        sqlite_where=ACTIVE_ONLY,
+        postgresql_where=ACTIVE_ONLY,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trading_rules_active', table_name='trading_rules')
@@ -4,14 +4,38 @@ All specialized agents inherit from this base class.
 """
 
 import logging
+import re
+import sys
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Pattern, Set, Tuple
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 logger = logging.getLogger(__name__)
 
 
+def compile_triggers(groups: Dict[str, Iterable[str]]) -> Pattern[str]:
+    """
+    Compile keyword groups into a single regex with one named group per key.
+    
+    Scanning a message once with the result replaces one substring search
+    per keyword; see match_triggers().
+    """
+    alternatives = [
+        f"(?P<{name}>{'|'.join(map(re.escape, keywords))})"
+        for name, keywords in groups.items()
+    ]
+    # Zero-width lookahead so a keyword in one group cannot hide an overlapping
+    # keyword from another (e.g. "eth" inside "valueth")
+    return re.compile(f"(?=(?:{'|'.join(alternatives)}))")
+
+
+def match_triggers(pattern: Pattern[str], message: str) -> Set[str]:
+    """Return the names of the keyword groups that occur in a lowercased message."""
+    return {match.lastgroup for match in pattern.finditer(message)}
+
+
 class AgentContext(BaseModel):
     """Context passed to agents containing relevant data."""
     user_message: str
@@ -19,15 +43,10 @@ class AgentContext(BaseModel):
     wallet_address: Optional[str] = None
     chat_history: List[Dict[str, str]] = []
     prices: Dict[str, float] = {}
-    timestamp: str = ""
-    
-    def __init__(self, **data):
-        if "timestamp" not in data or not data["timestamp"]:
-            data["timestamp"] = datetime.utcnow().isoformat()
-        super().__init__(**data)
+    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
     
-    class Config:
-        arbitrary_types_allowed = True
+    # Shared read-only by every agent the orchestrator fans out to
+    model_config = ConfigDict(frozen=True)
 
 
 class AgentResult(BaseModel):
@@ -37,15 +56,10 @@ class AgentResult(BaseModel):
     data: Dict[str, Any] = {}
     error: Optional[str] = None
     execution_time_ms: float = 0
-    timestamp: str = ""
-    
-    def __init__(self, **data):
-        if "timestamp" not in data or not data["timestamp"]:
-            data["timestamp"] = datetime.utcnow().isoformat()
-        super().__init__(**data)
+    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
     
-    class Config:
-        arbitrary_types_allowed = True
+    # Not frozen: _execute_with_timing fills in execution_time_ms afterwards
+    model_config = ConfigDict(validate_assignment=False)
 
 
 class BaseAgent(ABC):
@@ -89,11 +103,10 @@ class BaseAgent(ABC):
     
     async def _execute_with_timing(self, context: AgentContext) -> AgentResult:
         """Execute with timing wrapper."""
-        import time
-        start = time.time()
+        start = time.perf_counter_ns()
         try:
             result = await self.execute(context)
-            result.execution_time_ms = (time.time() - start) * 1000
+            result.execution_time_ms = (time.perf_counter_ns() - start) / 1_000_000
             return result
         except Exception as e:
             self.logger.error(f"Agent {self.name} failed: {e}")
@@ -101,7 +114,7 @@ class BaseAgent(ABC):
                 agent_name=self.name,
                 success=False,
                 error=str(e),
-                execution_time_ms=(time.time() - start) * 1000
+                execution_time_ms=(time.perf_counter_ns() - start) / 1_000_000
             )
 
 
@@ -109,6 +122,15 @@ class AgentCapability(BaseModel):
     """Describes what an agent can do - used by orchestrator."""
     name: str
     description: str
-    triggers: List[str]  # Keywords/patterns that trigger this agent
+    triggers: Tuple[str, ...]  # Keywords/patterns that trigger this agent
     priority: int = 5  # 1-10, higher = more important
     can_run_parallel: bool = True  # Can run with other agents
+    
+    @field_validator("triggers", mode="before")
+    @classmethod
+    def intern_triggers(cls, v):
+        """Store triggers as an immutable tuple of interned lowercase keywords."""
+        return tuple(sys.intern(t.lower()) for t in v)
+    
+    # Static per agent class
+    model_config = ConfigDict(frozen=True)
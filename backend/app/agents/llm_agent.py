@@ -1,83 +1,257 @@
-import json
+import asyncio
+import hashlib
 import os
 import ssl
 import certifi
 import re
 import logging
-from typing import Optional, Dict, Any, Literal, List
-from pydantic import BaseModel
+from functools import lru_cache
+from typing import Optional, Dict, Any, Literal, List, Tuple, Type, TypeVar, Callable, Awaitable, AsyncIterator
+import httpx
+from openai import AsyncOpenAI, AsyncAzureOpenAI, BadRequestError
+from pydantic import BaseModel, ConfigDict, field_validator
 from app.config import get_settings
 from app.models import ConditionType, ActionType
+from app.agents.base_agent import compile_triggers, match_triggers
+from app.agents.llm_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
-# Fix SSL certificate issues
-os.environ['SSL_CERT_FILE'] = certifi.where()
-os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
+# Fix SSL certificate issues (without overriding a bundle set by the environment)
+CA_BUNDLE = certifi.where()
+os.environ.setdefault('SSL_CERT_FILE', CA_BUNDLE)
+os.environ.setdefault('REQUESTS_CA_BUNDLE', CA_BUNDLE)
 
 settings = get_settings()
 
 
-async def get_openai_client():
-    """Get OpenAI client based on settings - supports Groq, Azure OpenAI, and standard OpenAI.
-    
+@lru_cache(maxsize=1)
+def _resolve_provider() -> Tuple[str, str]:
+    """Pick the LLM provider from settings once per process; returns (provider, model).
+
     Priority order:
     1. Groq (if USE_GROQ=true and GROQ_API_KEY is set) - RECOMMENDED, fastest
     2. Azure OpenAI (if USE_AZURE_OPENAI=true and credentials set)
     3. Standard OpenAI (if OPENAI_API_KEY is set)
     4. GitHub Proxy (if USE_GITHUB_PROXY=true)
     """
-    import httpx
-    from openai import AsyncOpenAI, AsyncAzureOpenAI
-    
-    http_client = httpx.AsyncClient(verify=certifi.where())
-    
-    # Log current config for debugging
-    logger.info(f"LLM Config: use_groq={settings.use_groq}, groq_key_set={bool(settings.groq_api_key)}")
-    
+    logger.debug(f"LLM Config: use_groq={settings.use_groq}, groq_key_set={bool(settings.groq_api_key)}")
+
     if settings.use_groq and settings.groq_api_key:
+        provider, model = "groq", settings.groq_model
+    elif settings.use_azure_openai and settings.azure_openai_api_key and settings.azure_openai_endpoint:
+        provider, model = "azure", settings.azure_openai_deployment
+    elif settings.openai_api_key:
+        provider, model = "openai", settings.llm_model
+    elif settings.use_github_proxy:
+        provider, model = "github_proxy", settings.llm_model
+    else:
+        raise ValueError("No LLM configured. Set GROQ_API_KEY, AZURE_OPENAI_API_KEY, OPENAI_API_KEY, or enable USE_GITHUB_PROXY")
+
+    logger.info(f"Using LLM provider {provider} with model {model}")
+    return provider, model
+
+
+def _create_openai_client(http_client: httpx.AsyncClient):
+    """Build the OpenAI-compatible client for the configured provider on top of ``http_client``."""
+    provider, model = _resolve_provider()
+
+    if provider == "groq":
         # Use Groq (fast inference)
-        logger.info(f"Using Groq with model {settings.groq_model}")
         client = AsyncOpenAI(
             api_key=settings.groq_api_key,
             base_url="https://api.groq.com/openai/v1",
             http_client=http_client
         )
-        model = settings.groq_model
-    elif settings.use_azure_openai and settings.azure_openai_api_key and settings.azure_openai_endpoint:
+    elif provider == "azure":
         # Use Azure OpenAI (GitHub Enterprise)
-        logger.info(f"Using Azure OpenAI at {settings.azure_openai_endpoint}")
         client = AsyncAzureOpenAI(
             api_key=settings.azure_openai_api_key,
             api_version=settings.azure_openai_api_version,
             azure_endpoint=settings.azure_openai_endpoint,
             http_client=http_client
         )
-        model = settings.azure_openai_deployment
-    elif settings.openai_api_key:
+    elif provider == "openai":
         # Use standard OpenAI
-        logger.info("Using standard OpenAI API")
         client = AsyncOpenAI(
             api_key=settings.openai_api_key,
             http_client=http_client
         )
-        model = settings.llm_model
-    elif settings.use_github_proxy:
+    else:
         # Use GitHub Models proxy
-        logger.info(f"Using GitHub Models proxy at {settings.github_proxy_url}")
         client = AsyncOpenAI(
             api_key="github-proxy",
             base_url=settings.github_proxy_url,
             http_client=http_client
         )
-        model = settings.llm_model
-    else:
-        raise ValueError("No LLM configured. Set GROQ_API_KEY, AZURE_OPENAI_API_KEY, OPENAI_API_KEY, or enable USE_GITHUB_PROXY")
-    
-    return client, model, http_client
+
+    return client, model
+
+
+# JSON wrapped in a markdown code block, as some models reply
+JSON_FENCE_PATTERN = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _parse_reply(model: Type[ModelT], content: str) -> ModelT:
+    """Validate an LLM reply as ``model``, unwrapping a markdown code block if needed.
+
+    model_validate_json decodes and validates in one pass, without building an
+    intermediate dict. Raises ValidationError (a ValueError) on bad replies.
+    """
+    text = content.strip()
+    # Bare JSON is the common case, so only search for a code block otherwise
+    if not text.startswith("{"):
+        json_match = JSON_FENCE_PATTERN.search(text)
+        if json_match:
+            text = json_match.group(1)
+    return model.model_validate_json(text)
+
+
+class _JsonObjectScanner:
+    """Track brace depth over streamed text to tell when the first JSON object is complete."""
+
+    def __init__(self):
+        self._chars: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.complete = False
+
+    def feed(self, text: str) -> None:
+        for ch in text:
+            # Skip any preamble or markdown fence before the object starts
+            if self._depth == 0 and ch != "{":
+                continue
+            self._chars.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+                    return
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chars)
+
+
+async def _read_json_object(texts: AsyncIterator[str]) -> str:
+    """Consume streamed text until the first JSON object closes and return it.
+
+    Returns everything received if no complete object arrives, so the caller's
+    parse error shows the full reply.
+    """
+    scanner = _JsonObjectScanner()
+    received = []
+    async for text in texts:
+        received.append(text)
+        scanner.feed(text)
+        if scanner.complete:
+            return scanner.text
+    return "".join(received)
+
+
+async def _completion_deltas(stream) -> AsyncIterator[str]:
+    """Yield the text deltas of an OpenAI-compatible streamed completion, then close it.
+
+    Closing early (once the caller stops iterating) stops the provider generating
+    any trailing tokens.
+    """
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        await stream.close()
+
+
+def _log_prompt_cache_usage(response) -> None:
+    """Log how many prompt tokens the provider served from its prefix cache.
+
+    OpenAI-compatible APIs cache the longest repeated prompt prefix automatically,
+    so the static system prompt must stay the first message for this to hit.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = details.get("cached_tokens") if isinstance(details, dict) else getattr(details, "cached_tokens", None)
+    logger.debug(f"Prompt cache: {cached} of {usage.prompt_tokens} prompt tokens cached")
+
+
+# Shared by every LLM caller so requests reuse one keep-alive connection pool
+# instead of paying a TCP+TLS handshake per call
+_http_client: Optional[httpx.AsyncClient] = None
+_sdk_clients: Dict[str, Any] = {}  # provider key -> SDK client built on _http_client
+# Caps in-flight provider requests across every caller in the process, so bursts
+# queue here instead of tripping provider rate limits
+llm_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            verify=CA_BUNDLE,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=30.0
+            )
+        )
+        # SDK clients wrap the old HTTP client, so rebuild them on top of the new one
+        _sdk_clients.clear()
+    return _http_client
+
+
+def _get_sdk_client(key: str, factory: Callable[[httpx.AsyncClient], Any]) -> Any:
+    """Get the cached SDK client for ``key``, building it with ``factory`` on first use."""
+    http_client = _get_http_client()
+    client = _sdk_clients.get(key)
+    if client is None:
+        client = _sdk_clients[key] = factory(http_client)
+    return client
+
+
+async def get_openai_client():
+    """Get the shared OpenAI client based on settings - supports Groq, Azure OpenAI, and standard OpenAI.
+
+    Returns (client, model, http_client). The clients are process-wide; callers
+    must not close them - close_llm_clients() does that on shutdown.
+    """
+    client, model = _get_sdk_client("default", _create_openai_client)
+    return client, model, _get_http_client()
+
+
+async def close_llm_clients():
+    """Close the shared HTTP client and drop the SDK clients built on it."""
+    if _http_client and not _http_client.is_closed:
+        await _http_client.aclose()
+    _sdk_clients.clear()
+
+
+# LLM output models: tolerate extra keys and stray whitespace, and are immutable so
+# cached instances can be handed out without copying
+LLM_OUTPUT_CONFIG = ConfigDict(extra="ignore", frozen=True, str_strip_whitespace=True)
 
 
 class ParsedCondition(BaseModel):
+    model_config = LLM_OUTPUT_CONFIG
+
     market: str
     condition_type: ConditionType
     condition_value: float
@@ -101,12 +275,16 @@ class ParsedCondition(BaseModel):
 
 
 class ParsedAction(BaseModel):
+    model_config = LLM_OUTPUT_CONFIG
+
     action_type: ActionType
     amount_percent: Optional[float] = 100.0
     amount_usd: Optional[float] = None
 
 
 class ParsedRule(BaseModel):
+    model_config = LLM_OUTPUT_CONFIG
+
     condition: ParsedCondition
     action: ParsedAction
     summary: str
@@ -114,6 +292,8 @@ class ParsedRule(BaseModel):
 
 class SecondaryIntent(BaseModel):
     """A secondary intent for compound queries."""
+    model_config = LLM_OUTPUT_CONFIG
+
     intent: str
     market: Optional[str] = None
     days: Optional[int] = None
@@ -123,6 +303,8 @@ class SecondaryIntent(BaseModel):
 
 
 class IntentClassification(BaseModel):
+    model_config = LLM_OUTPUT_CONFIG
+
     intent: Literal["trading_rule", "trading_action", "balance_query", "price_query", "position_query", "historical_price_query", "profit_calculation", "profit_scan", "comparison_query", "market_analysis", "rules_query", "help", "general_chat"]
     market: Optional[str] = None  # For price/position queries
     days: Optional[int] = None  # For historical queries
@@ -132,6 +314,27 @@ class IntentClassification(BaseModel):
     confidence: float = 1.0
     secondary_intents: Optional[List[SecondaryIntent]] = None  # For compound queries
 
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def default_null_confidence(cls, v):
+        """LLMs sometimes send null; treat it like an omitted field."""
+        return 1.0 if v is None else v
+
+    @field_validator("secondary_intents", mode="before")
+    @classmethod
+    def drop_incomplete_secondary_intents(cls, v):
+        """Keep only entries that name an intent; an empty list means none."""
+        if not v:
+            return None
+        intents = [si for si in v if isinstance(si, dict) and si.get("intent")]
+        return intents or None
+
+
+# Shared results for the fixed-answer classifications; callers treat intents as read-only
+HELP_INTENT = IntentClassification(intent="help", confidence=0.99)
+RULES_QUERY_INTENT = IntentClassification(intent="rules_query", confidence=0.99)
+GENERAL_CHAT_FALLBACK = IntentClassification(intent="general_chat", confidence=0.5)
+
 
 class ChatResponse(BaseModel):
     intent: str
@@ -139,6 +342,54 @@ class ChatResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None
 
 
+# Built once at import; the schemas never change at runtime
+PARSED_RULE_SCHEMA = ParsedRule.model_json_schema()
+INTENT_SCHEMA = IntentClassification.model_json_schema()
+
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+# Not strict: strict mode requires every field to be required, while these models have defaults
+PARSED_RULE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "ParsedRule", "schema": PARSED_RULE_SCHEMA, "strict": False},
+}
+INTENT_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "IntentClassification", "schema": INTENT_SCHEMA, "strict": False},
+}
+
+
+# Cleared the first time the configured model rejects json_schema (older OpenAI
+# models such as gpt-3.5-turbo or gpt-4-turbo only accept json_object)
+_json_schema_supported = True
+
+ResultT = TypeVar("ResultT")
+
+
+def _response_format(schema_format: Dict[str, Any]) -> Dict[str, Any]:
+    """Use ``schema_format`` where the provider supports json_schema, else plain JSON mode.
+
+    Groq, the GitHub proxy and Azure's configured API version only accept json_object.
+    """
+    provider, _ = _resolve_provider()
+    return schema_format if provider == "openai" and _json_schema_supported else JSON_OBJECT_FORMAT
+
+
+async def _with_response_format(
+    call: Callable[[Dict[str, Any]], Awaitable[ResultT]], schema_format: Dict[str, Any]
+) -> ResultT:
+    """Run ``call(response_format)``, retrying once in plain JSON mode if the model rejects json_schema."""
+    global _json_schema_supported
+    response_format = _response_format(schema_format)
+    try:
+        return await call(response_format)
+    except BadRequestError as e:
+        if response_format is JSON_OBJECT_FORMAT or "response_format" not in f"{e.param} {e.message}":
+            raise
+        logger.warning(f"Model rejected json_schema output, using json_object from now on: {e.message}")
+        _json_schema_supported = False
+        return await call(JSON_OBJECT_FORMAT)
+
+
 SYSTEM_PROMPT = """You are a trading rule parser. Convert natural language trading instructions into structured JSON rules.
 
 IMPORTANT: You are given the CURRENT PRICE for context. Use it to calculate actual target prices.
@@ -221,6 +472,9 @@ Response:
 
 Parse the user's trading instruction and return ONLY the JSON, no other text."""
 
+# Static system messages are built once and shared; never mutate them
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
 
 INTELLIGENT_ROUTER_PROMPT = """You are an intelligent router for a crypto trading bot. Your job is to understand the user's request and decide which function/capability to use.
 
@@ -339,6 +593,153 @@ Look for words like: "and", "also", "plus", "with", "along with", or comma-separ
 
 Note: secondary_intents should be an empty array [] if there's only ONE intent, or omitted entirely."""
 
+ROUTER_SYSTEM_MESSAGE = {"role": "system", "content": INTELLIGENT_ROUTER_PROMPT}
+
+
+MARKET_KEYWORDS = {
+    "btc": "BTC-PERP", "bitcoin": "BTC-PERP",
+    "sol": "SOL-PERP", "solana": "SOL-PERP",
+    "eth": "ETH-PERP", "ethereum": "ETH-PERP",
+    "doge": "DOGE-PERP", "dogecoin": "DOGE-PERP",
+    "xrp": "XRP-PERP", "ripple": "XRP-PERP",
+    "bonk": "BONK-PERP",
+    "wif": "WIF-PERP", "dogwifhat": "WIF-PERP",
+    "pepe": "PEPE-PERP",
+    "shib": "SHIB-PERP", "shiba": "SHIB-PERP",
+    "jup": "JUP-PERP", "jupiter": "JUP-PERP",
+    "link": "LINK-PERP", "chainlink": "LINK-PERP",
+    "avax": "AVAX-PERP", "avalanche": "AVAX-PERP",
+    "ada": "ADA-PERP", "cardano": "ADA-PERP",
+    "matic": "MATIC-PERP", "polygon": "MATIC-PERP",
+    "dot": "DOT-PERP", "polkadot": "DOT-PERP",
+}
+
+# Whole words only, so e.g. "ethical" or "solution" don't match a market
+MARKET_PATTERN = re.compile(
+    r"\b(" + "|".join(sorted(map(re.escape, MARKET_KEYWORDS), key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+
+
+# Period and amount extraction
+DAYS_PATTERN = re.compile(r'(\d+)\s*day')
+LAST_N_PATTERN = re.compile(r'last\s+(\d+)')
+# INR patterns: 1000 inr, 1000 rupee, ₹1000, Rs. 1000, Rs 1000
+INR_AMOUNT_PATTERN = re.compile(r'(?:₹|rs\.?\s*|inr\s*)([\d,]+(?:\.\d{2})?)|([\d,]+(?:\.\d{2})?)\s*(?:inr|rupees?)')
+DOLLAR_AMOUNT_PATTERN = re.compile(r'\$\s*([\d,]+(?:\.\d{2})?)')
+USD_AMOUNT_PATTERN = re.compile(r'([\d,]+(?:\.\d{2})?)\s*(?:dollars?|usd)')
+# A number NOT followed by time-related words (excludes "7 days", "1 week", ...)
+BARE_AMOUNT_PATTERN = re.compile(r'([\d,]+(?:\.\d{2})?)\s*(?!days?|weeks?|months?|years?|hours?|minutes?)')
+
+# Display symbol and approximate units per USD for supported investment currencies
+CURRENCY_SYMBOLS = {"USD": "$", "INR": "₹"}
+USD_EXCHANGE_RATES = {"USD": 1.0, "INR": 83.0}
+
+
+# Trivial intents classify_intent answers locally. Single words are matched as
+# whole tokens (so "helpful" isn't help); phrases are scanned in one regex pass.
+WORD_PATTERN = re.compile(r"[a-z]+")
+HELP_TOKENS = frozenset({"help", "commands"})
+# Messages made only of these words are small talk; no need to ask the router
+SMALL_TALK_TOKENS = frozenset({
+    "hi", "hello", "hey", "yo", "gm", "sup", "thanks", "thank", "you", "thx",
+    "ok", "okay", "cool", "nice", "great", "bye", "goodbye",
+})
+QUICK_INTENT_KEYWORDS = compile_triggers({
+    "help": ["what can you do"],
+    "rules_query": ["my rules", "show rules", "list rules"],
+})
+
+# Routine lookups answered from context without the router. Any blocker word or
+# digit hints at a rule, trade, period or comparison, so those go to the LLM.
+LOCAL_ROUTE_TOKENS = {
+    "balance_query": frozenset({"balance", "balances", "funds"}),
+    "position_query": frozenset({"position", "positions", "portfolio"}),
+    "price_query": frozenset({"price", "prices", "worth"}),
+}
+LOCAL_ROUTE_PHRASES = compile_triggers({
+    "balance_query": ["how much do i have", "how much money"],
+    "position_query": ["open trades"],
+    "price_query": ["how much is"],
+})
+LOCAL_ROUTE_BLOCKERS = frozenset({
+    "if", "when", "once", "buy", "sell", "long", "short", "close", "open", "trade",
+    "rule", "rules", "alert", "compare", "vs", "versus", "history", "historical",
+    "ago", "yesterday", "last", "day", "days", "week", "weeks", "month", "months",
+    "profit", "profits", "make", "made", "earn", "would", "could", "should",
+    "predict", "analysis", "analyze", "trend", "chart", "change", "why",
+})
+LOCAL_ROUTE_CONFIDENCE = 0.95
+
+
+# History the router sees: the last few turns, each capped at roughly 80 tokens
+ROUTER_HISTORY_TURNS = 4
+HISTORY_TURN_CHARS = 300
+
+# Words, amounts and currency symbols; punctuation and spacing don't change intent
+INTENT_KEY_TOKEN_PATTERN = re.compile(r"[\w$₹%]+(?:[.,]\d+)*")
+
+
+def _intent_cache_key(user_input: str, chat_history: Optional[List[Dict]]) -> bytes:
+    """Digest of the normalised input plus the recent history the router would see.
+
+    Normalising to tokens lets trivially different phrasings ("BTC price?",
+    "btc price") share a cached classification.
+    """
+    recent = tuple(
+        (msg["role"], msg["content"][:HISTORY_TURN_CHARS]) for msg in (chat_history or [])[-ROUTER_HISTORY_TURNS:]
+    )
+    key = (" ".join(INTENT_KEY_TOKEN_PATTERN.findall(user_input.lower())), recent)
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+
+@lru_cache(maxsize=2048)
+def _classify_quick_intent(lower_input: str) -> Optional[IntentClassification]:
+    """Classify trivial queries locally; None means the LLM router should decide.
+
+    Pure function of the input, so repeated phrases skip even the keyword scan.
+    """
+    tokens = set(WORD_PATTERN.findall(lower_input))
+    matched = match_triggers(QUICK_INTENT_KEYWORDS, lower_input)
+    if "help" in matched or not HELP_TOKENS.isdisjoint(tokens):
+        return HELP_INTENT
+    
+    if "rules_query" in matched:
+        return RULES_QUERY_INTENT
+    
+    if tokens and tokens <= SMALL_TALK_TOKENS and not any(ch.isdigit() for ch in lower_input):
+        return GENERAL_CHAT_FALLBACK
+    
+    return None
+
+
+@lru_cache(maxsize=2048)
+def classify_local_route(lower_input: str) -> Optional[IntentClassification]:
+    """Route unambiguous balance/position/price lookups without an LLM call.
+
+    Returns None when zero or several routes match, so compound and unusual
+    queries still reach the router.
+    """
+    if any(ch.isdigit() for ch in lower_input):
+        return None
+    tokens = set(WORD_PATTERN.findall(lower_input))
+    if not LOCAL_ROUTE_BLOCKERS.isdisjoint(tokens):
+        return None
+    
+    routes = match_triggers(LOCAL_ROUTE_PHRASES, lower_input)
+    routes.update(name for name, words in LOCAL_ROUTE_TOKENS.items() if not words.isdisjoint(tokens))
+    if len(routes) != 1:
+        return None
+    
+    intent = routes.pop()
+    markets = {MARKET_KEYWORDS[m.lower()] for m in MARKET_PATTERN.findall(lower_input)}
+    if len(markets) > 1:
+        return None
+    market = markets.pop() if markets else None
+    if intent != "price_query" and market:
+        return None  # e.g. "my sol position" asks for a filtered view; let the router decide
+    return IntentClassification(intent=intent, market=market, confidence=LOCAL_ROUTE_CONFIDENCE)
+
 
 CHAT_SYSTEM_PROMPT = """You are a helpful trading assistant for a Solana-based perpetual futures trading bot using Drift Protocol.
 
@@ -355,6 +756,8 @@ Available markets: SOL-PERP, BTC-PERP, ETH-PERP, DOGE-PERP, XRP-PERP
 Keep responses concise and helpful. For trading-related questions, provide clear explanations.
 When presenting data, format it nicely for the user."""
 
+CHAT_SYSTEM_MESSAGE = {"role": "system", "content": CHAT_SYSTEM_PROMPT}
+
 
 SMART_ASSISTANT_PROMPT = """You are an intelligent trading assistant for a Solana-based perpetual futures trading bot using Drift Protocol.
 
@@ -467,226 +870,274 @@ Would you like me to create a trading rule for this?
 - Keep responses concise but informative"""
 
 
+HELP_TEXT = """Welcome to the Solana Trading Bot!
+
+I can help you with:
+- **Check Balance**: Ask "What's my balance?" or "How much money do I have?"
+- **Check Prices**: Ask "What's the price of BTC?" or "Show me crypto prices"
+- **Historical Prices**: Ask "How did SOL perform last 7 days?" or "Show me BTC history"
+- **Compare Currencies**: Ask "Which crypto performed best last 7 days?" or "Compare all currencies"
+- **Profit Calculator**: Ask "How much profit if I invested $100 in SOL last week?"
+- **View Positions**: Ask "What are my positions?" or "Show my portfolio"
+- **Create Trading Rules**: Use natural language like "Buy BTC when it drops below $60,000"
+
+**💡 Pro Tip - Profit in Down Markets:**
+This bot uses Drift Protocol perpetual futures, so you can:
+- **Short (Sell)** to profit when prices DROP: "Sell SOL if it goes above $150"
+- **Long (Buy)** to profit when prices RISE: "Buy BTC when it drops below $60,000"
+
+Available Markets: SOL, BTC, ETH, DOGE, XRP (perpetual futures)
+
+The bot is currently running in simulation mode with $10,000 virtual funds."""
+
+
+# Offline market-analysis fallbacks, filled in with the coin symbol
+MEME_COINS = frozenset({"BONK", "WIF", "PEPE", "SHIB", "DOGE"})
+
+MEME_COIN_ANALYSIS_TEXT = """**{coin} Analysis:**
+- 🎭 **Meme Coin**: High volatility, sentiment-driven
+- 📊 **Market Cap**: Typically lower than major cryptos
+- 💡 **Price Drivers**: Social media trends, influencer mentions, community activity
+- ⚠️ **Risk**: Very high - prices can swing 50%+ in a day
+
+{coin} prices often move based on:
+- Twitter/X trends and viral content
+- Celebrity/influencer mentions
+- Overall crypto market sentiment
+- Speculative trading volume"""
+
+COIN_PRICE_FACTORS_TEXT = """**{coin} Price Factors:**
+- 📈 Overall crypto market sentiment
+- 🏛️ Regulatory news
+- 🔧 Project development updates
+- 💰 Institutional investment flows"""
+
+SIMULATED_BALANCE_TEXT = "Your account balance:\n- USDC: $10,000.00 (Simulation Mode)\n- Available Margin: $10,000.00\n\nNote: Running in simulation mode with virtual funds."
+
+
 class LLMAgent:
     def __init__(self):
         self.settings = get_settings()
+        self._anthropic_client = None
+        if self.settings.anthropic_api_key:
+            # Imported here so processes without an Anthropic key never load the SDK
+            from anthropic import AsyncAnthropic
+
+            self._anthropic_client = AsyncAnthropic(api_key=self.settings.anthropic_api_key)
+        # Exact-match caches for repeated inputs; rules go stale faster than chat
+        self._rule_cache = ResponseCache(ttl_seconds=300)
+        self._chat_cache = ResponseCache(ttl_seconds=3600)
+        self._intent_cache = ResponseCache(ttl_seconds=600, max_size=512)
+
+        # Intent name -> handler; anything else is general chat
+        self._intent_handlers: Dict[str, Callable[[Any, Dict[str, Any], str], Awaitable[ChatResponse]]] = {
+            "balance_query": self._handle_balance_query,
+            "price_query": self._handle_price_query,
+            "position_query": self._handle_position_query,
+            "rules_query": self._handle_rules_query,
+            "trading_action": self._handle_trading_action,
+            "help": self._handle_help,
+            "trading_rule": self._handle_trading_rule,
+            "historical_price_query": self._handle_historical_price_query,
+            "profit_calculation": self._handle_profit_calculation,
+            "profit_scan": self._handle_profit_scan,
+            "comparison_query": self._handle_comparison_query,
+            "market_analysis": self._handle_market_analysis,
+        }
+
+    async def _stream_json_completion(self, client: AsyncOpenAI, **kwargs) -> str:
+        """Stream a chat completion and return its JSON object, stopping as soon as it closes."""
+        async with llm_semaphore:
+            stream = await client.chat.completions.create(stream=True, **kwargs)
+            deltas = _completion_deltas(stream)
+            try:
+                return await _read_json_object(deltas)
+            finally:
+                await deltas.aclose()
+
+    def _get_openai_client(self):
+        """Get the shared (client, model) pair for the configured provider."""
+        return _get_sdk_client("default", _create_openai_client)
+
+    def _get_github_proxy_client(self) -> AsyncOpenAI:
+        """Get the shared GitHub Models proxy client."""
+        return _get_sdk_client("github_proxy", lambda http_client: AsyncOpenAI(
+            api_key="github-proxy",  # Proxy uses GITHUB_TOKEN from env
+            base_url=self.settings.github_proxy_url,
+            http_client=http_client
+        ))
+
+    async def close(self):
+        """Close connections."""
+        await close_llm_clients()
+
+        if self._anthropic_client:
+            await self._anthropic_client.close()
 
     async def parse_trading_rule(self, user_input: str, current_price: Optional[float] = None) -> ParsedRule:
         """Parse natural language trading instruction into structured rule."""
+        cache_key = (" ".join(user_input.lower().split()), round(current_price or 0, 2))
+        cached = self._rule_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         context = f"Current price context: ${current_price}" if current_price else ""
         user_message = f"{context}\n\nUser instruction: {user_input}"
 
         # Check Groq first (fast inference)
         if self.settings.use_groq and self.settings.groq_api_key:
-            return await self._parse_with_openai(user_message)  # Uses get_openai_client which handles Groq
+            parsed = await self._parse_with_openai(user_message)  # Uses get_openai_client which handles Groq
         # Check for Azure OpenAI (GitHub Enterprise)
         elif self.settings.use_azure_openai and self.settings.azure_openai_api_key:
-            return await self._parse_with_openai(user_message)
+            parsed = await self._parse_with_openai(user_message)
         # Then GitHub proxy
         elif self.settings.use_github_proxy:
-            return await self._parse_with_github_proxy(user_message)
+            parsed = await self._parse_with_github_proxy(user_message)
         elif self.settings.openai_api_key:
-            return await self._parse_with_openai(user_message)
+            parsed = await self._parse_with_openai(user_message)
         elif self.settings.anthropic_api_key:
-            return await self._parse_with_anthropic(user_message)
+            parsed = await self._parse_with_anthropic(user_message)
         else:
             raise ValueError("No LLM configured. Set GROQ_API_KEY, AZURE_OPENAI_API_KEY, OPENAI_API_KEY, or enable USE_GITHUB_PROXY")
 
+        self._rule_cache.set(cache_key, parsed)
+        return parsed
+
     async def _parse_with_github_proxy(self, user_message: str) -> ParsedRule:
         """Parse using GitHub Models proxy (Claude via GitHub)."""
-        import httpx
-        from openai import AsyncOpenAI
+        client = self._get_github_proxy_client()
 
-        # Create HTTP client with proper SSL
-        http_client = httpx.AsyncClient(verify=certifi.where())
-
-        # Connect to local GitHub proxy
-        client = AsyncOpenAI(
-            api_key="github-proxy",  # Proxy uses GITHUB_TOKEN from env
-            base_url=self.settings.github_proxy_url,
-            http_client=http_client
+        content = await self._stream_json_completion(
+            client,
+            model=self.settings.llm_model,  # claude-3.5-sonnet
+            messages=[
+                SYSTEM_MESSAGE,
+                {"role": "user", "content": user_message}
+            ],
+            temperature=0,
+            max_tokens=256
         )
-
-        try:
-            response = await client.chat.completions.create(
-                model=self.settings.llm_model,  # claude-3.5-sonnet
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.1
-            )
-
-            content = response.choices[0].message.content
-            # Try to parse JSON from the response
-            try:
-                result = json.loads(content)
-            except json.JSONDecodeError:
-                # Try to extract JSON from markdown code block
-                import re
-                json_match = re.search(r'```(?:json)?\s*(.*?)\s*```', content, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group(1))
-                else:
-                    raise ValueError(f"Could not parse JSON from response: {content}")
-
-            return ParsedRule(**result)
-        finally:
-            await http_client.aclose()
+        return _parse_reply(ParsedRule, content)
 
     async def _parse_with_openai(self, user_message: str) -> ParsedRule:
         """Parse using OpenAI API or Azure OpenAI."""
-        client, model, http_client = await get_openai_client()
+        client, model = self._get_openai_client()
         
-        try:
-            response = await client.chat.completions.create(
+        content = await _with_response_format(
+            lambda response_format: self._stream_json_completion(
+                client,
                 model=model,
                 messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
+                    SYSTEM_MESSAGE,
                     {"role": "user", "content": user_message}
                 ],
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
-
-            result = json.loads(response.choices[0].message.content)
-            return ParsedRule(**result)
-        finally:
-            await http_client.aclose()
+                temperature=0,
+                max_tokens=256,
+                response_format=response_format
+            ),
+            PARSED_RULE_FORMAT
+        )
+        # JSON mode guarantees bare JSON, so decode and validate in one pass
+        return ParsedRule.model_validate_json(content)
 
     async def _parse_with_anthropic(self, user_message: str) -> ParsedRule:
         """Parse using Anthropic API."""
-        from anthropic import AsyncAnthropic
-
-        client = AsyncAnthropic(api_key=self.settings.anthropic_api_key)
-
-        response = await client.messages.create(
+        async with llm_semaphore, self._anthropic_client.messages.stream(
             model="claude-3-opus-20240229",
-            max_tokens=1024,
-            system=SYSTEM_PROMPT,
+            max_tokens=256,
+            temperature=0,
+            # Block form so the static prompt is served from Anthropic's prompt cache
+            system=[{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
             messages=[
                 {"role": "user", "content": user_message}
-            ]
-        )
+            ],
+            extra_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+        ) as stream:
+            # Leaving the block closes the stream once the JSON object is complete
+            content = await _read_json_object(stream.text_stream)
 
-        # Extract JSON from response
-        content = response.content[0].text
-        # Try to parse JSON from the response
-        try:
-            result = json.loads(content)
-        except json.JSONDecodeError:
-            # Try to extract JSON from markdown code block
-            import re
-            json_match = re.search(r'```(?:json)?\s*(.*?)\s*```', content, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group(1))
-            else:
-                raise ValueError(f"Could not parse JSON from response: {content}")
-
-        return ParsedRule(**result)
+        return _parse_reply(ParsedRule, content)
 
     async def classify_intent(self, user_input: str, last_context: Optional[Dict] = None, chat_history: Optional[List[Dict]] = None) -> IntentClassification:
         """
         Classify the intent of user's message using LLM as the intelligent router.
         The LLM understands context and decides which function to call.
         """
-        lower_input = user_input.lower().strip()
-        
         # Quick pattern matching ONLY for trivial queries (save LLM calls)
-        if any(kw in lower_input for kw in ["help", "what can you do", "commands"]):
-            return IntentClassification(intent="help", confidence=0.99)
+        quick_intent = _classify_quick_intent(user_input.lower().strip())
+        if quick_intent is not None:
+            return quick_intent
         
-        if any(kw in lower_input for kw in ["my rules", "show rules", "list rules"]):
-            return IntentClassification(intent="rules_query", confidence=0.99)
+        # Routine lookups; a marketless follow-up ("and its price?") needs history, so ask the router
+        local_intent = classify_local_route(user_input.lower().strip())
+        if local_intent is not None and (local_intent.market or not chat_history):
+            return local_intent
         
+        # The router only sees the text and the last few turns, so key on exactly that
+        cache_key = _intent_cache_key(user_input, chat_history)
+        cached = self._intent_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Use LLM for ALL other classifications - it's smarter at understanding intent
-        return await self._classify_with_llm_router(user_input, chat_history)
+        intent = await self._classify_with_llm_router(user_input, chat_history)
+
+        # Fallbacks usually mean a failed call, so don't pin them in the cache
+        if intent is not GENERAL_CHAT_FALLBACK:
+            self._intent_cache.set(cache_key, intent)
+        return intent
 
     async def _classify_with_llm_router(self, user_input: str, chat_history: Optional[List[Dict]] = None) -> IntentClassification:
         """Use LLM as intelligent router to classify intent and extract parameters."""
-        client, model, http_client = await get_openai_client()
-
-        # Build context from chat history if available
-        context_text = ""
-        if chat_history and len(chat_history) > 0:
-            recent_history = chat_history[-4:] if len(chat_history) > 4 else chat_history
-            context_text = "\n\nCONVERSATION HISTORY (for follow-up detection):\n" + "\n".join([
-                f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content'][:300]}"
-                for msg in recent_history
-            ])
-        
-        user_message = f"USER MESSAGE: {user_input}{context_text}"
+        client, model = self._get_openai_client()
+
+        # Recent turns as real messages (for follow-up detection), oldest first and the
+        # current message last, so everything before it is a prefix the provider can cache
+        messages = [ROUTER_SYSTEM_MESSAGE]
+        messages.extend(
+            {"role": "user" if msg["role"] == "user" else "assistant", "content": msg["content"][:HISTORY_TURN_CHARS]}
+            for msg in (chat_history or [])[-ROUTER_HISTORY_TURNS:]
+        )
+        messages.append({"role": "user", "content": user_input})
 
         try:
-            response = await client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": INTELLIGENT_ROUTER_PROMPT},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.1
-            )
+            async with llm_semaphore:
+                # The budget covers the provider call only, not the wait for a free slot
+                response = await _with_response_format(
+                    lambda response_format: asyncio.wait_for(
+                        client.chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            temperature=0,
+                            max_tokens=192,
+                            response_format=response_format
+                        ),
+                        timeout=self.settings.llm_router_timeout_seconds
+                    ),
+                    INTENT_FORMAT
+                )
+            _log_prompt_cache_usage(response)
 
             content = response.choices[0].message.content
             try:
-                result = json.loads(content)
-            except json.JSONDecodeError:
-                json_match = re.search(r'```(?:json)?\s*(.*?)\s*```', content, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group(1))
-                else:
-                    logger.warning(f"Could not parse LLM router response: {content}")
-                    return IntentClassification(intent="general_chat", confidence=0.5)
-
-            # Parse secondary_intents if present
-            secondary_intents = None
-            if "secondary_intents" in result and result["secondary_intents"]:
-                secondary_intents = [
-                    SecondaryIntent(**{k: v for k, v in si.items() if k in SecondaryIntent.__fields__ and v is not None})
-                    for si in result["secondary_intents"]
-                    if isinstance(si, dict) and si.get("intent")
-                ]
-                if not secondary_intents:
-                    secondary_intents = None
-            
-            # Build IntentClassification from result
-            valid_fields = {k: v for k, v in result.items() 
-                          if k in IntentClassification.__fields__ and v is not None and k != "secondary_intents"}
-            valid_fields["secondary_intents"] = secondary_intents
-            return IntentClassification(**valid_fields)
+                # JSON mode guarantees bare JSON, so no markdown unwrapping needed
+                return IntentClassification.model_validate_json(content)
+            except ValueError:
+                logger.warning(f"Could not parse LLM router response: {content}")
+                return GENERAL_CHAT_FALLBACK
             
+        except asyncio.TimeoutError:
+            logger.warning("LLM router timed out, falling back to general_chat")
+            return GENERAL_CHAT_FALLBACK
         except Exception as e:
             logger.error(f"LLM router failed: {e}")
             # Fallback to general_chat on failure
-            return IntentClassification(intent="general_chat", confidence=0.5)
-        finally:
-            await http_client.aclose()
+            return GENERAL_CHAT_FALLBACK
 
     def _extract_market(self, text: str) -> Optional[str]:
         """Extract market symbol from text."""
-        market_map = {
-            "btc": "BTC-PERP", "bitcoin": "BTC-PERP",
-            "sol": "SOL-PERP", "solana": "SOL-PERP",
-            "eth": "ETH-PERP", "ethereum": "ETH-PERP",
-            "doge": "DOGE-PERP", "dogecoin": "DOGE-PERP",
-            "xrp": "XRP-PERP", "ripple": "XRP-PERP",
-            "bonk": "BONK-PERP",
-            "wif": "WIF-PERP", "dogwifhat": "WIF-PERP",
-            "pepe": "PEPE-PERP",
-            "shib": "SHIB-PERP", "shiba": "SHIB-PERP",
-            "jup": "JUP-PERP", "jupiter": "JUP-PERP",
-            "link": "LINK-PERP", "chainlink": "LINK-PERP",
-            "avax": "AVAX-PERP", "avalanche": "AVAX-PERP",
-            "ada": "ADA-PERP", "cardano": "ADA-PERP",
-            "matic": "MATIC-PERP", "polygon": "MATIC-PERP",
-            "dot": "DOT-PERP", "polkadot": "DOT-PERP",
-        }
-        text_lower = text.lower()
-        for keyword, market in market_map.items():
-            if keyword in text_lower:
-                return market
-        return None
+        match = MARKET_PATTERN.search(text)
+        return MARKET_KEYWORDS[match.group(1).lower()] if match else None
 
     def _extract_days(self, text: str) -> Optional[int]:
         """Extract number of days from text."""
@@ -703,12 +1154,12 @@ class LLMAgent:
             return 1
         
         # Try to extract number followed by "day"
-        day_match = re.search(r'(\d+)\s*day', text_lower)
+        day_match = DAYS_PATTERN.search(text_lower)
         if day_match:
             return int(day_match.group(1))
         
         # Try to extract "last N"
-        last_match = re.search(r'last\s+(\d+)', text_lower)
+        last_match = LAST_N_PATTERN.search(text_lower)
         if last_match:
             return int(last_match.group(1))
         
@@ -725,24 +1176,24 @@ class LLMAgent:
         text_lower = text.lower()
         
         # INR patterns: 1000 inr, 1000 rupee, ₹1000, Rs. 1000, Rs 1000
-        inr_match = re.search(r'(?:₹|rs\.?\s*|inr\s*)([\d,]+(?:\.\d{2})?)|([\d,]+(?:\.\d{2})?)\s*(?:inr|rupees?)', text_lower)
+        inr_match = INR_AMOUNT_PATTERN.search(text_lower)
         if inr_match:
             amount_str = inr_match.group(1) or inr_match.group(2)
             return float(amount_str.replace(',', '')), "INR"
         
         # Dollar amounts: $100, $1,000, $1000, 100 dollars, etc.
-        dollar_match = re.search(r'\$\s*([\d,]+(?:\.\d{2})?)', text)
+        dollar_match = DOLLAR_AMOUNT_PATTERN.search(text)
         if dollar_match:
             return float(dollar_match.group(1).replace(',', '')), "USD"
         
         # Match "X dollars" or "X USD"
-        amount_match = re.search(r'([\d,]+(?:\.\d{2})?)\s*(?:dollars?|usd)', text_lower)
+        amount_match = USD_AMOUNT_PATTERN.search(text_lower)
         if amount_match:
             return float(amount_match.group(1).replace(',', '')), "USD"
         
         # Just a number with no currency - but NOT followed by time-related words
         # Exclude patterns like "7 days", "30 days", "1 week", etc.
-        num_match = re.search(r'([\d,]+(?:\.\d{2})?)\s*(?!days?|weeks?|months?|years?|hours?|minutes?)', text)
+        num_match = BARE_AMOUNT_PATTERN.search(text)
         if num_match:
             num_val = float(num_match.group(1).replace(',', ''))
             # Sanity check - if it's a small number (< 10), it's probably not an amount
@@ -752,104 +1203,84 @@ class LLMAgent:
         # Default to $100 USD for profit calculations if no amount specified
         return 100.0, "USD"
 
-    async def _classify_with_llm(self, user_input: str) -> IntentClassification:
-        """Classify intent using LLM."""
-        client, model, http_client = await get_openai_client()
-
-        try:
-            response = await client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": INTENT_CLASSIFICATION_PROMPT},
-                    {"role": "user", "content": user_input}
-                ],
-                temperature=0.1
-            )
-
-            content = response.choices[0].message.content
-            try:
-                result = json.loads(content)
-            except json.JSONDecodeError:
-                json_match = re.search(r'```(?:json)?\s*(.*?)\s*```', content, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group(1))
-                else:
-                    return IntentClassification(intent="general_chat", confidence=0.5)
-
-            return IntentClassification(**result)
-        except Exception as e:
-            return IntentClassification(intent="general_chat", confidence=0.5)
-        finally:
-            await http_client.aclose()
-
     async def _process_single_intent(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
         """Process a single intent and return a ChatResponse. Used for both primary and secondary intents."""
-        
-        if intent.intent == "balance_query":
-            balance_data = context.get("balance", {})
-            return ChatResponse(
-                intent="balance_query",
-                response=self._format_balance_response(balance_data),
-                data=balance_data
-            )
+        handler = self._intent_handlers.get(intent.intent)
+        if handler is None:
+            # General chat
+            return await self._chat_with_llm(user_input, context)
+        return await handler(intent, context, user_input)
+
+    async def _handle_balance_query(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Answer from the account balance in context."""
+        balance_data = context.get("balance", {})
+        return ChatResponse.model_construct(
+            intent="balance_query",
+            response=self._format_balance_response(balance_data),
+            data=balance_data
+        )
 
-        elif intent.intent == "price_query":
-            prices = context.get("prices", {})
-            market = intent.market
-            if market and market in prices:
-                price = prices[market]
-                return ChatResponse(
-                    intent="price_query",
-                    response=f"The current price of {market.replace('-PERP', '')} is **${price:,.2f}**",
-                    data={"market": market, "price": price, "intent": "price_query"}
-                )
-            elif prices:
-                return ChatResponse(
-                    intent="price_query",
-                    response=self._format_prices_response(prices),
-                    data={"prices": prices, "intent": "price_query"}
-                )
-            return ChatResponse(
+    async def _handle_price_query(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Answer with one market's price, or all prices if no known market was named."""
+        prices = context.get("prices", {})
+        market = intent.market
+        if market and market in prices:
+            price = prices[market]
+            return ChatResponse.model_construct(
                 intent="price_query",
-                response="Unable to fetch prices at the moment. Please try again.",
-                data=None
+                response=f"The current price of {market.removesuffix('-PERP')} is **${price:,.2f}**",
+                data={"market": market, "price": price, "intent": "price_query"}
             )
-
-        elif intent.intent == "position_query":
-            positions = context.get("positions", [])
-            return ChatResponse(
-                intent="position_query",
-                response=self._format_positions_response(positions),
-                data={"positions": positions}
+        elif prices:
+            return ChatResponse.model_construct(
+                intent="price_query",
+                response=self._format_prices_response(prices),
+                data={"prices": prices, "intent": "price_query"}
             )
+        return ChatResponse.model_construct(
+            intent="price_query",
+            response="Unable to fetch prices at the moment. Please try again.",
+            data=None
+        )
 
-        elif intent.intent == "rules_query":
-            return ChatResponse(
-                intent="rules_query",
-                response="Fetching your rules...",
-                data={"needs_fetch": True}
-            )
+    async def _handle_position_query(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """List the open positions in context."""
+        positions = context.get("positions", [])
+        return ChatResponse.model_construct(
+            intent="position_query",
+            response=self._format_positions_response(positions),
+            data={"positions": positions}
+        )
 
-        elif intent.intent == "trading_action":
-            market = intent.market or "SOL-PERP"
-            symbol = market.replace("-PERP", "")
-            amount = intent.amount or 100.0
-            currency = intent.currency or "USD"
-            position_type = intent.position_type or "long"
-            currency_symbol = "$" if currency == "USD" else "₹"
-            
-            position_emoji = "📉" if position_type == "short" else "📈"
-            action_word = "SHORT (sell)" if position_type == "short" else "LONG (buy)"
-            action_type = "sell" if position_type == "short" else "buy"
-            
-            prices = context.get("prices", {})
-            current_price = prices.get(market, 0)
-            price_str = f"${current_price:,.2f}" if current_price else "N/A"
-            rule_summary = f"{action_word} {symbol} at current price (${current_price:,.2f}) with {currency_symbol}{amount:,.2f}"
-            
-            return ChatResponse(
-                intent="trading_action",
-                response=f"""{position_emoji} **{action_word} Order - {symbol}**
+    async def _handle_rules_query(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Ask the caller to fetch the user's rules."""
+        return ChatResponse.model_construct(
+            intent="rules_query",
+            response="Fetching your rules...",
+            data={"needs_fetch": True}
+        )
+
+    async def _handle_trading_action(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Turn an immediate buy/sell request into a rule the user can confirm."""
+        market = intent.market or "SOL-PERP"
+        symbol = market.removesuffix("-PERP")
+        amount = intent.amount or 100.0
+        currency = intent.currency or "USD"
+        position_type = intent.position_type or "long"
+        currency_symbol = CURRENCY_SYMBOLS.get(currency, "$")
+        
+        position_emoji = "📉" if position_type == "short" else "📈"
+        action_word = "SHORT (sell)" if position_type == "short" else "LONG (buy)"
+        action_type = "sell" if position_type == "short" else "buy"
+        
+        prices = context.get("prices", {})
+        current_price = prices.get(market, 0)
+        price_str = f"${current_price:,.2f}" if current_price else "N/A"
+        rule_summary = f"{action_word} {symbol} at current price (${current_price:,.2f}) with {currency_symbol}{amount:,.2f}"
+        
+        return ChatResponse.model_construct(
+            intent="trading_action",
+            response=f"""{position_emoji} **{action_word} Order - {symbol}**
 
 **Order Details:**
 - Position: {action_word}
@@ -859,153 +1290,165 @@ class LLMAgent:
 
 ✅ **Ready to create trading rule!**
 Click **"Create Rule"** to confirm this order.""",
-                data={
-                    "should_create_rule": True,
-                    "original_input": user_input,
-                    "action": "trade_request",
-                    "market": market,
-                    "position_type": position_type,
-                    "action_type": action_type,
-                    "amount": amount,
-                    "currency": currency,
-                    "current_price": current_price,
-                    "parsed_rule": {
-                        "condition": {
-                            "market": market,
-                            "condition_type": "price_above" if position_type == "short" else "price_below",
-                            "condition_value": current_price * 0.999 if position_type == "short" else current_price * 1.001,
-                            "reference": "current_price"
-                        },
-                        "action": {
-                            "action_type": action_type,
-                            "amount_percent": None,
-                            "amount_usd": amount
-                        },
-                        "summary": rule_summary
+            data={
+                "should_create_rule": True,
+                "original_input": user_input,
+                "action": "trade_request",
+                "market": market,
+                "position_type": position_type,
+                "action_type": action_type,
+                "amount": amount,
+                "currency": currency,
+                "current_price": current_price,
+                "parsed_rule": {
+                    "condition": {
+                        "market": market,
+                        "condition_type": "price_above" if position_type == "short" else "price_below",
+                        "condition_value": current_price * 0.999 if position_type == "short" else current_price * 1.001,
+                        "reference": "current_price"
                     },
-                    "simulation_mode": True
-                }
-            )
+                    "action": {
+                        "action_type": action_type,
+                        "amount_percent": None,
+                        "amount_usd": amount
+                    },
+                    "summary": rule_summary
+                },
+                "simulation_mode": True
+            }
+        )
 
-        elif intent.intent == "help":
-            return ChatResponse(
-                intent="help",
-                response=self._get_help_response(),
-                data=None
-            )
+    async def _handle_help(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Return the static help text."""
+        return ChatResponse.model_construct(
+            intent="help",
+            response=self._get_help_response(),
+            data=None
+        )
 
-        elif intent.intent == "trading_rule":
-            return ChatResponse(
-                intent="trading_rule",
-                response="Got it! I'm creating your trading rule now...",
-                data={"should_create_rule": True, "original_input": user_input}
-            )
+    async def _handle_trading_rule(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Hand the message to the rule parser."""
+        return ChatResponse.model_construct(
+            intent="trading_rule",
+            response="Got it! I'm creating your trading rule now...",
+            data={"should_create_rule": True, "original_input": user_input}
+        )
 
-        elif intent.intent == "historical_price_query":
-            historical_data = context.get("historical_data")
-            if historical_data:
-                historical_data["intent"] = "historical_price_query"
-                return ChatResponse(
-                    intent="historical_price_query",
-                    response=self._format_historical_response(historical_data),
-                    data=historical_data
-                )
-            return ChatResponse(
+    async def _handle_historical_price_query(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Format fetched history, or ask the caller to fetch it."""
+        historical_data = context.get("historical_data")
+        if historical_data:
+            historical_data["intent"] = "historical_price_query"
+            return ChatResponse.model_construct(
                 intent="historical_price_query",
-                response="I'll fetch the historical data for you...",
-                data={
-                    "needs_fetch": True,
-                    "market": intent.market or "SOL-PERP",
-                    "days": intent.days or 7,
-                    "intent": "historical_price_query"
-                }
+                response=self._format_historical_response(historical_data),
+                data=historical_data
             )
+        return ChatResponse.model_construct(
+            intent="historical_price_query",
+            response="I'll fetch the historical data for you...",
+            data={
+                "needs_fetch": True,
+                "market": intent.market or "SOL-PERP",
+                "days": intent.days or 7,
+                "intent": "historical_price_query"
+            }
+        )
 
-        elif intent.intent == "profit_calculation":
-            profit_data = context.get("profit_data")
-            if profit_data:
-                profit_data["intent"] = "profit_calculation"
-                return ChatResponse(
-                    intent="profit_calculation",
-                    response=self._format_profit_response(profit_data),
-                    data=profit_data
-                )
-            return ChatResponse(
+    async def _handle_profit_calculation(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Format a fetched profit calculation, or ask the caller to run it."""
+        profit_data = context.get("profit_data")
+        if profit_data:
+            profit_data["intent"] = "profit_calculation"
+            return ChatResponse.model_construct(
                 intent="profit_calculation",
-                response="I'll calculate that for you...",
-                data={
-                    "needs_calculation": True,
-                    "market": intent.market or "SOL-PERP",
-                    "days": intent.days or 7,
-                    "amount": intent.amount or 100.0,
-                    "currency": intent.currency or "USD",
-                    "position_type": intent.position_type or "long",
-                    "intent": "profit_calculation"
-                }
+                response=self._format_profit_response(profit_data),
+                data=profit_data
             )
+        return ChatResponse.model_construct(
+            intent="profit_calculation",
+            response="I'll calculate that for you...",
+            data={
+                "needs_calculation": True,
+                "market": intent.market or "SOL-PERP",
+                "days": intent.days or 7,
+                "amount": intent.amount or 100.0,
+                "currency": intent.currency or "USD",
+                "position_type": intent.position_type or "long",
+                "intent": "profit_calculation"
+            }
+        )
 
-        elif intent.intent == "profit_scan":
-            profit_scan_data = context.get("profit_scan_data")
-            if profit_scan_data:
-                return ChatResponse(
-                    intent="profit_scan",
-                    response=self._format_profit_scan_response(profit_scan_data),
-                    data=profit_scan_data
-                )
-            return ChatResponse(
+    async def _handle_profit_scan(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Format a fetched market scan, or ask the caller to run it."""
+        profit_scan_data = context.get("profit_scan_data")
+        if profit_scan_data:
+            return ChatResponse.model_construct(
                 intent="profit_scan",
-                response="I'll scan all coins for profit opportunities...",
-                data={
-                    "needs_scan": True,
-                    "days": intent.days or 7,
-                    "amount": intent.amount or 100.0,
-                    "currency": intent.currency or "USD",
-                    "intent": "profit_scan"
-                }
+                response=self._format_profit_scan_response(profit_scan_data),
+                data=profit_scan_data
             )
+        return ChatResponse.model_construct(
+            intent="profit_scan",
+            response="I'll scan all coins for profit opportunities...",
+            data={
+                "needs_scan": True,
+                "days": intent.days or 7,
+                "amount": intent.amount or 100.0,
+                "currency": intent.currency or "USD",
+                "intent": "profit_scan"
+            }
+        )
 
-        elif intent.intent == "comparison_query":
-            comparison_data = context.get("comparison_data")
-            if comparison_data:
-                return ChatResponse(
-                    intent="comparison_query",
-                    response=self._format_comparison_response(comparison_data),
-                    data=comparison_data
-                )
-            return ChatResponse(
+    async def _handle_comparison_query(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Format fetched comparison data, or ask the caller to fetch it."""
+        comparison_data = context.get("comparison_data")
+        if comparison_data:
+            return ChatResponse.model_construct(
                 intent="comparison_query",
-                response="I'll compare all currencies for you...",
-                data={
-                    "needs_comparison": True,
-                    "days": intent.days or 7
-                }
+                response=self._format_comparison_response(comparison_data),
+                data=comparison_data
             )
+        return ChatResponse.model_construct(
+            intent="comparison_query",
+            response="I'll compare all currencies for you...",
+            data={
+                "needs_comparison": True,
+                "days": intent.days or 7
+            }
+        )
 
-        elif intent.intent == "market_analysis":
-            analysis_data = context.get("market_analysis_data")
-            if analysis_data:
-                return ChatResponse(
-                    intent="market_analysis",
-                    response=self._format_market_analysis_response(analysis_data, user_input),
-                    data=analysis_data
-                )
-            return ChatResponse(
+    async def _handle_market_analysis(self, intent: Any, context: Dict[str, Any], user_input: str) -> ChatResponse:
+        """Format fetched news analysis, or ask the caller to search."""
+        analysis_data = context.get("market_analysis_data")
+        if analysis_data:
+            return ChatResponse.model_construct(
                 intent="market_analysis",
-                response="Let me search for the latest news and analysis...",
-                data={
-                    "needs_search": True,
-                    "market": intent.market or "SOL-PERP",
-                    "question": user_input,
-                    "intent": "market_analysis"
-                }
+                response=self._format_market_analysis_response(analysis_data, user_input),
+                data=analysis_data
             )
+        return ChatResponse.model_construct(
+            intent="market_analysis",
+            response="Let me search for the latest news and analysis...",
+            data={
+                "needs_search": True,
+                "market": intent.market or "SOL-PERP",
+                "question": user_input,
+                "intent": "market_analysis"
+            }
+        )
 
-        else:
-            # General chat
-            return await self._chat_with_llm(user_input, context)
+    async def chat(
+        self,
+        user_input: str,
+        context: Dict[str, Any] = None,
+        context_loader: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None
+    ) -> ChatResponse:
+        """Handle conversational chat with context. Supports compound queries with multiple intents.
 
-    async def chat(self, user_input: str, context: Dict[str, Any] = None) -> ChatResponse:
-        """Handle conversational chat with context. Supports compound queries with multiple intents."""
+        If context_loader is given, its result (e.g. live prices/balance) is fetched
+        concurrently with intent classification and merged into context.
+        """
         context = context or {}
         
         # Get previous context and chat history for follow-up questions
@@ -1013,36 +1456,61 @@ Click **"Create Rule"** to confirm this order.""",
         chat_history = context.get("chat_history", [])
         
         # Classify intent (LLM will detect compound queries and return secondary_intents)
-        intent = await self.classify_intent(user_input, last_context, chat_history)
-
-        # Process primary intent
-        primary_response = await self._process_single_intent(intent, context, user_input)
+        if context_loader:
+            intent, loaded_context = await asyncio.gather(
+                self.classify_intent(user_input, last_context, chat_history),
+                context_loader()
+            )
+            context = {**context, **loaded_context}
+        else:
+            intent = await self.classify_intent(user_input, last_context, chat_history)
+
+        # Secondary intents (compound queries) inherit unspecified params from the primary
+        secondary_intents = [
+            SecondaryIntent(
+                intent=si.intent,
+                market=si.market or intent.market,
+                days=si.days or intent.days,
+                amount=si.amount or intent.amount,
+                currency=si.currency or intent.currency,
+                position_type=si.position_type or intent.position_type
+            )
+            for si in intent.secondary_intents or []
+        ]
+        
+        # Process primary and secondary intents concurrently; they only read context
+        primary_response, *secondary_results = await asyncio.gather(
+            self._process_single_intent(intent, context, user_input),
+            *(self._process_single_intent(si, context, user_input) for si in secondary_intents),
+            return_exceptions=True
+        )
+        if isinstance(primary_response, BaseException):
+            raise primary_response
         
-        # Check for secondary intents (compound queries)
-        if intent.secondary_intents:
-            # Add secondary intents info to data for chat.py to process
+        if secondary_intents:
             primary_response.data = primary_response.data or {}
+            primary_response.data["secondary_intents"] = [si.model_dump() for si in secondary_intents]
             
-            # Convert SecondaryIntent objects to serializable dicts
-            secondary_list = []
-            for si in intent.secondary_intents:
-                si_dict = {
-                    "intent": si.intent,
-                    "market": si.market or intent.market,  # Inherit market if not specified
-                    "days": si.days or intent.days,
-                    "amount": si.amount or intent.amount,
-                    "currency": si.currency or intent.currency,
-                    "position_type": si.position_type or intent.position_type
-                }
-                secondary_list.append(si_dict)
+            secondary_responses = []
+            for si, result in zip(secondary_intents, secondary_results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Secondary intent {si.intent} failed: {result}")
+                    continue
+                secondary_responses.append(result)
             
-            primary_response.data["secondary_intents"] = secondary_list
+            if secondary_responses:
+                primary_response.response = "\n\n".join(
+                    [primary_response.response] + [r.response for r in secondary_responses]
+                )
+                primary_response.data["secondary_responses"] = [
+                    {"intent": r.intent, "data": r.data} for r in secondary_responses
+                ]
         
         return primary_response
 
     def _format_balance_response(self, balance: Dict) -> str:
         if not balance:
-            return "Your account balance:\n- USDC: $10,000.00 (Simulation Mode)\n- Available Margin: $10,000.00\n\nNote: Running in simulation mode with virtual funds."
+            return SIMULATED_BALANCE_TEXT
 
         total = balance.get("total_usd", 0)
         available = balance.get("available_usd", 0)
@@ -1052,45 +1520,24 @@ Click **"Create Rule"** to confirm this order.""",
         if not prices:
             return "Unable to fetch prices at the moment."
 
-        lines = ["Current Market Prices:"]
-        for market, price in prices.items():
-            symbol = market.replace("-PERP", "")
-            lines.append(f"- {symbol}: ${price:,.2f}")
-        return "\n".join(lines)
+        return "Current Market Prices:\n" + "\n".join(
+            f"- {market.removesuffix('-PERP')}: ${price:,.2f}" for market, price in prices.items()
+        )
 
     def _format_positions_response(self, positions: list) -> str:
         if not positions:
             return "You don't have any open positions.\n\nIn simulation mode, create a trading rule to start paper trading!"
 
-        lines = ["Your Open Positions:"]
-        for pos in positions:
-            lines.append(f"- {pos['market']}: {pos['size']} @ ${pos['entry_price']:,.2f}")
-        return "\n".join(lines)
+        return "Your Open Positions:\n" + "\n".join(
+            f"- {pos['market']}: {pos['size']} @ ${pos['entry_price']:,.2f}" for pos in positions
+        )
 
     def _get_help_response(self) -> str:
-        return """Welcome to the Solana Trading Bot!
-
-I can help you with:
-- **Check Balance**: Ask "What's my balance?" or "How much money do I have?"
-- **Check Prices**: Ask "What's the price of BTC?" or "Show me crypto prices"
-- **Historical Prices**: Ask "How did SOL perform last 7 days?" or "Show me BTC history"
-- **Compare Currencies**: Ask "Which crypto performed best last 7 days?" or "Compare all currencies"
-- **Profit Calculator**: Ask "How much profit if I invested $100 in SOL last week?"
-- **View Positions**: Ask "What are my positions?" or "Show my portfolio"
-- **Create Trading Rules**: Use natural language like "Buy BTC when it drops below $60,000"
-
-**💡 Pro Tip - Profit in Down Markets:**
-This bot uses Drift Protocol perpetual futures, so you can:
-- **Short (Sell)** to profit when prices DROP: "Sell SOL if it goes above $150"
-- **Long (Buy)** to profit when prices RISE: "Buy BTC when it drops below $60,000"
-
-Available Markets: SOL, BTC, ETH, DOGE, XRP (perpetual futures)
-
-The bot is currently running in simulation mode with $10,000 virtual funds."""
+        return HELP_TEXT
 
     def _format_historical_response(self, data: Dict) -> str:
         """Format historical price data response."""
-        market = data.get("market", "").replace("-PERP", "")
+        market = data.get("market", "").removesuffix("-PERP")
         days = data.get("days", 7)
         
         stats = data.get("statistics", {})
@@ -1121,7 +1568,7 @@ The chart shows {market} has been {direction} over the past {days} days."""
 
     def _format_profit_response(self, data: Dict) -> str:
         """Format profit calculation response."""
-        market = data.get("market", "").replace("-PERP", "")
+        market = data.get("market", "").removesuffix("-PERP")
         days = data.get("days", 7)
         amount = data.get("investment_amount", 100)
         currency = data.get("currency", "USD")
@@ -1138,14 +1585,11 @@ The chart shows {market} has been {direction} over the past {days} days."""
             return f"Unable to calculate profit - invalid price data."
         
         # Currency conversion (approximate rates)
-        currency_symbol = "$" if currency == "USD" else "₹"
-        usd_to_inr = 83.0  # Approximate conversion rate
+        currency_symbol = CURRENCY_SYMBOLS.get(currency, "$")
+        usd_rate = USD_EXCHANGE_RATES.get(currency, 1.0)
         
         # Convert investment to USD for calculation
-        if currency == "INR":
-            amount_usd = amount / usd_to_inr
-        else:
-            amount_usd = amount
+        amount_usd = amount / usd_rate
         
         # Calculate profit based on position type
         price_change_pct = ((current_price - start_price) / start_price) * 100
@@ -1164,7 +1608,7 @@ The chart shows {market} has been {direction} over the past {days} days."""
             profit_usd = current_value_usd - amount_usd
             profit_pct = (profit_usd / amount_usd) * 100
             # Convert back to original currency
-            profit = profit_usd * usd_to_inr if currency == "INR" else profit_usd
+            profit = profit_usd * usd_rate
             final_value = amount + profit
             position_label = "LONG (buy)"
             position_desc = "bought and held"
@@ -1203,13 +1647,12 @@ The chart shows {market} has been {direction} over the past {days} days."""
         if not results:
             return "Unable to scan markets. Please try again later."
         
-        currency_symbol = "$" if currency == "USD" else "₹"
-        usd_to_inr = 83.0
+        currency_symbol = CURRENCY_SYMBOLS.get(currency, "$")
         
         # Calculate profit for each coin (both LONG and SHORT)
         coin_profits = []
         for result in results:
-            market = result.get("market", "").replace("-PERP", "")
+            market = result.get("market", "").removesuffix("-PERP")
             start_price = result.get("start_price", 0)
             current_price = result.get("current_price", 0)
             change_pct = result.get("price_change_percent", 0)
@@ -1238,7 +1681,8 @@ The chart shows {market} has been {direction} over the past {days} days."""
         # Sort by absolute change (most movement first)
         coin_profits.sort(key=lambda x: abs(x["change_pct"]), reverse=True)
         
-        # Find profitable opportunities
+        # Find profitable opportunities. Profit is proportional to the move, so these
+        # keep the biggest-move-first order above and need no re-sort
         long_profitable = [c for c in coin_profits if c["long_profit"] > 0]
         short_profitable = [c for c in coin_profits if c["short_profit"] > 0]
         
@@ -1248,9 +1692,8 @@ The chart shows {market} has been {direction} over the past {days} days."""
         # Summary
         if long_profitable:
             lines.append(f"✅ **{len(long_profitable)} coin(s) would have profited from LONG (buying)**")
-            for coin in sorted(long_profitable, key=lambda x: x["long_profit"], reverse=True):
-                sign = "+"
-                lines.append(f"   - {coin['market']}: {sign}{currency_symbol}{coin['long_profit']:,.2f} ({sign}{coin['long_profit_pct']:.2f}%)")
+            for coin in long_profitable:
+                lines.append(f"   - {coin['market']}: +{currency_symbol}{coin['long_profit']:,.2f} (+{coin['long_profit_pct']:.2f}%)")
         else:
             lines.append("❌ **No coins profitable for LONG positions** (market was down)")
         
@@ -1258,9 +1701,8 @@ The chart shows {market} has been {direction} over the past {days} days."""
         
         if short_profitable:
             lines.append(f"✅ **{len(short_profitable)} coin(s) would have profited from SHORT (selling)**")
-            for coin in sorted(short_profitable, key=lambda x: x["short_profit"], reverse=True):
-                sign = "+"
-                lines.append(f"   - {coin['market']}: {sign}{currency_symbol}{coin['short_profit']:,.2f} ({sign}{coin['short_profit_pct']:.2f}%)")
+            for coin in short_profitable:
+                lines.append(f"   - {coin['market']}: +{currency_symbol}{coin['short_profit']:,.2f} (+{coin['short_profit_pct']:.2f}%)")
         else:
             lines.append("❌ **No coins profitable for SHORT positions** (market was up)")
         
@@ -1295,7 +1737,7 @@ The chart shows {market} has been {direction} over the past {days} days."""
         # Best performer
         if sorted_results:
             best = sorted_results[0]
-            symbol = best.get("market", "").replace("-PERP", "")
+            symbol = best.get("market", "").removesuffix("-PERP")
             change_pct = best.get("price_change_percent", 0)
             sign = "+" if change_pct >= 0 else ""
             lines.append(f"🥇 **Best Performer:** {symbol} ({sign}{change_pct:.2f}%)")
@@ -1303,7 +1745,7 @@ The chart shows {market} has been {direction} over the past {days} days."""
         # Worst performer
         if len(sorted_results) > 1:
             worst = sorted_results[-1]
-            symbol = worst.get("market", "").replace("-PERP", "")
+            symbol = worst.get("market", "").removesuffix("-PERP")
             change_pct = worst.get("price_change_percent", 0)
             sign = "+" if change_pct >= 0 else ""
             lines.append(f"🥉 **Worst Performer:** {symbol} ({sign}{change_pct:.2f}%)")
@@ -1311,7 +1753,7 @@ The chart shows {market} has been {direction} over the past {days} days."""
         lines.append("\n**All Rankings:**")
         
         for i, result in enumerate(sorted_results, 1):
-            market = result.get("market", "").replace("-PERP", "")
+            market = result.get("market", "").removesuffix("-PERP")
             current = result.get("current_price", 0)
             change_pct = result.get("price_change_percent", 0)
             sign = "+" if change_pct >= 0 else ""
@@ -1342,38 +1784,22 @@ The chart shows {market} has been {direction} over the past {days} days."""
             
             for i, result in enumerate(search_results[:4], 1):
                 title = result.get("title", "")
-                body = result.get("body", "")[:200]
-                href = result.get("href", "")
+                if not title:
+                    continue
                 
-                if title:
-                    lines.append(f"**{i}. {title}**")
-                    if body:
-                        lines.append(f"   {body}...")
-                    if href:
-                        lines.append(f"   🔗 [Read more]({href})\n")
+                lines.append(f"**{i}. {title}**")
+                body = result.get("body", "")
+                if body:
+                    lines.append(f"   {body[:200]}...")
+                href = result.get("href", "")
+                if href:
+                    lines.append(f"   🔗 [Read more]({href})\n")
         else:
             lines.append("*No recent news found. Here's what we know:*\n")
             
             # Provide general analysis based on coin type
-            meme_coins = ["BONK", "WIF", "PEPE", "SHIB", "DOGE"]
-            if coin in meme_coins:
-                lines.append(f"""**{coin} Analysis:**
-- 🎭 **Meme Coin**: High volatility, sentiment-driven
-- 📊 **Market Cap**: Typically lower than major cryptos
-- 💡 **Price Drivers**: Social media trends, influencer mentions, community activity
-- ⚠️ **Risk**: Very high - prices can swing 50%+ in a day
-
-{coin} prices often move based on:
-- Twitter/X trends and viral content
-- Celebrity/influencer mentions
-- Overall crypto market sentiment
-- Speculative trading volume""")
-            else:
-                lines.append(f"""**{coin} Price Factors:**
-- 📈 Overall crypto market sentiment
-- 🏛️ Regulatory news
-- 🔧 Project development updates
-- 💰 Institutional investment flows""")
+            template = MEME_COIN_ANALYSIS_TEXT if coin in MEME_COINS else COIN_PRICE_FACTORS_TEXT
+            lines.append(template.format(coin=coin))
         
         lines.append("\n💡 **Tip:** Would you like to set up a price alert or trading rule for {coin}?".format(coin=coin))
         
@@ -1395,7 +1821,7 @@ The chart shows {market} has been {direction} over the past {days} days."""
         Returns:
             ChatResponse with intelligent LLM-generated response
         """
-        client, model, http_client = await get_openai_client()
+        client, model = self._get_openai_client()
         
         # Build comprehensive context string for the LLM
         context_parts = []
@@ -1473,12 +1899,13 @@ The chart shows {market} has been {direction} over the past {days} days."""
         messages.append({"role": "user", "content": user_input})
         
         try:
-            response = await client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1000
-            )
+            async with llm_semaphore:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1000
+                )
             
             response_text = response.choices[0].message.content
             
@@ -1524,8 +1951,6 @@ The chart shows {market} has been {direction} over the past {days} days."""
                 response=f"I'm having trouble processing your request. Please try again.",
                 data={"error": str(e)}
             )
-        finally:
-            await http_client.aclose()
 
     async def insightful_chat(
         self, 
@@ -1556,7 +1981,7 @@ The chart shows {market} has been {direction} over the past {days} days."""
         Returns:
             ChatResponse with insightful analysis and trade suggestions
         """
-        client, model, http_client = await get_openai_client()
+        client, model = self._get_openai_client()
         
         # Build comprehensive market context
         coin = market_data.get("coin", "UNKNOWN")
@@ -1636,12 +2061,13 @@ The chart shows {market} has been {direction} over the past {days} days."""
         messages.append({"role": "user", "content": user_input})
         
         try:
-            response = await client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1200
-            )
+            async with llm_semaphore:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1200
+                )
             
             response_text = response.choices[0].message.content
             
@@ -1677,44 +2103,55 @@ The chart shows {market} has been {direction} over the past {days} days."""
                 response=f"{trend_emoji} **{coin}-PERP: ${current_price:,.2f}**\n\n7-Day Change: {f'{price_change_7d:+.2f}%' if price_change_7d else 'N/A'}\n\n_Unable to fetch detailed analysis. Please try again._",
                 data={"error": str(e), "current_price": current_price}
             )
-        finally:
-            await http_client.aclose()
 
     async def _chat_with_llm(self, user_input: str, context: Dict) -> ChatResponse:
         """Generate a chat response using LLM."""
-        client, model, http_client = await get_openai_client()
+        client, model = self._get_openai_client()
 
         # Build context message
-        context_info = ""
-        if context.get("prices"):
-            context_info += f"\nCurrent prices: {json.dumps(context['prices'])}"
-        if context.get("balance"):
-            context_info += f"\nUser balance: {json.dumps(context['balance'])}"
+        context_lines = []
+        prices = context.get("prices")
+        if prices:
+            context_lines.append("Current prices: " + ", ".join(
+                f"{market.removesuffix('-PERP')}=${price:.2f}" for market, price in prices.items()
+            ))
+        balance = context.get("balance")
+        if balance:
+            context_lines.append(
+                f"User balance: total=${balance.get('total_usd') or 0:.2f} "
+                f"available=${balance.get('available_usd') or 0:.2f}"
+            )
+        context_info = "\n".join(context_lines)
+
+        cache_key = (" ".join(user_input.lower().split()), context_info)
+        cached = self._chat_cache.get(cache_key)
+        if cached is not None:
+            return ChatResponse(intent="general_chat", response=cached, data=None)
+
+        # Live data goes in its own message so CHAT_SYSTEM_PROMPT stays a cacheable prefix
+        messages = [CHAT_SYSTEM_MESSAGE]
+        if context_info:
+            messages.append({"role": "system", "content": context_info})
+        messages.append({"role": "user", "content": user_input})
 
         try:
-            response = await client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": CHAT_SYSTEM_PROMPT + context_info},
-                    {"role": "user", "content": user_input}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+            async with llm_semaphore:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=500
+                )
 
-            return ChatResponse(
-                intent="general_chat",
-                response=response.choices[0].message.content,
-                data=None
-            )
+            text = response.choices[0].message.content
+            self._chat_cache.set(cache_key, text)
+            return ChatResponse(intent="general_chat", response=text, data=None)
         except Exception as e:
             return ChatResponse(
                 intent="general_chat",
                 response="I'm having trouble processing your request. Please try again or ask for help.",
                 data=None
             )
-        finally:
-            await http_client.aclose()
 
 
 # Singleton instance
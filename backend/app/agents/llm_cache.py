@@ -0,0 +1,32 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ResponseCache:
+    """In-memory LRU cache with a TTL for LLM results, to skip repeat round-trips."""
+
+    def __init__(self, ttl_seconds: float, max_size: int = 512):
+        self._cache: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()  # key -> (value, timestamp)
+        self._ttl = ttl_seconds
+        self._max_size = max_size
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        value, ts = entry
+        if time.monotonic() - ts >= self._ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._cache[key] = (value, time.monotonic())
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
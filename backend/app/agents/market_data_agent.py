@@ -2,11 +2,17 @@
 Market Data Agent - Fetches and caches price data, statistics, and indicators.
 """
 
+import asyncio
+import bisect
 import logging
+import re
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
-from app.agents.base_agent import BaseAgent, AgentContext, AgentResult, AgentCapability
+from app.agents.base_agent import (
+    BaseAgent, AgentContext, AgentResult, AgentCapability, compile_triggers, match_triggers
+)
+from app.agents.llm_cache import ResponseCache
 from app.services.drift_service import drift_service
 from app.services import price_history_service
 
@@ -30,25 +36,44 @@ class MarketDataAgent(BaseAgent):
         can_run_parallel=True
     )
     
+    # Price-related and market keywords, matched in a single scan
+    _KEYWORDS = compile_triggers({
+        "price": ["price", "cost", "worth", "value", "how much", "$"],
+        "market": ["sol", "btc", "eth", "bitcoin", "solana", "ethereum", "doge", "xrp"],
+    })
+    
+    # Coin names and tickers; whole words only, so e.g. "solution" isn't SOL
+    _COIN_SYMBOLS = {
+        "sol": "SOL", "solana": "SOL",
+        "btc": "BTC", "bitcoin": "BTC",
+        "eth": "ETH", "ethereum": "ETH",
+        "doge": "DOGE", "dogecoin": "DOGE",
+        "xrp": "XRP", "ripple": "XRP",
+        "bonk": "BONK",
+        "wif": "WIF", "dogwifhat": "WIF",
+        "pepe": "PEPE"
+    }
+    _COIN_PATTERN = re.compile(
+        r"\b(" + "|".join(sorted(map(re.escape, _COIN_SYMBOLS), key=len, reverse=True)) + r")\b"
+    )
+    
+    # 7-day % moves above each threshold step up from weak to moderate to strong
+    _TREND_THRESHOLDS = (3, 10)
+    _TREND_STRENGTHS = ("weak", "moderate", "strong")
+    
+    # Market data by market, shared by all instances; entries are read-only once cached
+    _cache = ResponseCache(ttl_seconds=30, max_size=256)
+    
     def __init__(self):
         super().__init__("market_data")
-        self._cache: Dict[str, Dict] = {}
-        self._cache_ttl = 30  # seconds
     
     def can_handle(self, context: AgentContext) -> float:
         """Check if this agent should handle the request."""
-        message = context.user_message.lower()
+        matched = match_triggers(self._KEYWORDS, context.user_message.lower())
         
-        # Check for price-related keywords
-        price_keywords = ["price", "cost", "worth", "value", "how much", "$"]
-        market_keywords = ["sol", "btc", "eth", "bitcoin", "solana", "ethereum", "doge", "xrp"]
-        
-        has_price_keyword = any(kw in message for kw in price_keywords)
-        has_market_keyword = any(kw in message for kw in market_keywords)
-        
-        if has_price_keyword and has_market_keyword:
+        if len(matched) == 2:
             return 0.9
-        elif has_price_keyword or has_market_keyword:
+        elif matched:
             return 0.6
         return 0.1
     
@@ -60,21 +85,26 @@ class MarketDataAgent(BaseAgent):
             if not coins:
                 coins = ["SOL"]  # Default
             
+            # Serve cached markets, then fetch the rest concurrently
             results = {}
+            misses = []
             for coin in coins:
                 market = f"{coin}-PERP"
-                
-                # Check cache first
                 cached = self._get_cached(market)
                 if cached:
                     results[market] = cached
+                else:
+                    misses.append(market)
+            
+            fetched = await asyncio.gather(
+                *(self._fetch_market_data(market) for market in misses),
+                return_exceptions=True
+            )
+            for market, market_data in zip(misses, fetched):
+                if isinstance(market_data, Exception):
+                    logger.warning(f"Failed to fetch market data for {market}: {market_data}")
                     continue
-                
-                # Fetch fresh data
-                market_data = await self._fetch_market_data(market)
                 results[market] = market_data
-                
-                # Cache it
                 self._set_cache(market, market_data)
             
             return AgentResult(
@@ -113,16 +143,19 @@ class MarketDataAgent(BaseAgent):
             "volatility": None
         }
         
-        # Get current price
-        try:
-            price = await drift_service.get_perp_market_price(market)
+        # Current price and 7-day stats come from independent services
+        price, stats = await asyncio.gather(
+            drift_service.get_perp_market_price(market),
+            price_history_service.get_price_statistics(market, 7),
+            return_exceptions=True
+        )
+        if not isinstance(price, BaseException):
             data["current_price"] = price
-        except:
-            pass
+        if isinstance(stats, BaseException):
+            logger.warning(f"Failed to get stats for {market}: {stats}")
+            stats = None
         
-        # Get 7-day stats
         try:
-            stats = await price_history_service.get_price_statistics(market, 7)
             if stats:
                 data["price_change_7d"] = stats.get("price_change_percent")
                 data["high_7d"] = stats.get("high_price")
@@ -135,73 +168,32 @@ class MarketDataAgent(BaseAgent):
                     data["support_level"] = data["low_7d"] + (range_size * 0.1)
                     data["resistance_level"] = data["high_7d"] - (range_size * 0.1)
                 
-                # Determine trend
+                # Determine trend; strength depends only on the size of the move
                 change = data["price_change_7d"] or 0
-                if change > 10:
-                    data["trend"] = "bullish"
-                    data["trend_strength"] = "strong"
-                elif change > 3:
-                    data["trend"] = "bullish"
-                    data["trend_strength"] = "moderate"
-                elif change > 0:
-                    data["trend"] = "bullish"
-                    data["trend_strength"] = "weak"
-                elif change < -10:
-                    data["trend"] = "bearish"
-                    data["trend_strength"] = "strong"
-                elif change < -3:
-                    data["trend"] = "bearish"
-                    data["trend_strength"] = "moderate"
-                elif change < 0:
-                    data["trend"] = "bearish"
-                    data["trend_strength"] = "weak"
+                if change:
+                    data["trend"] = "bullish" if change > 0 else "bearish"
+                    data["trend_strength"] = self._TREND_STRENGTHS[
+                        bisect.bisect_left(self._TREND_THRESHOLDS, abs(change))
+                    ]
         except Exception as e:
             logger.warning(f"Failed to get stats for {market}: {e}")
         
         return data
     
     def _detect_coins(self, message: str) -> list:
-        """Detect coin symbols from message."""
-        message_lower = message.lower()
-        coin_map = {
-            "sol": "SOL", "solana": "SOL",
-            "btc": "BTC", "bitcoin": "BTC",
-            "eth": "ETH", "ethereum": "ETH",
-            "doge": "DOGE", "dogecoin": "DOGE",
-            "xrp": "XRP", "ripple": "XRP",
-            "bonk": "BONK",
-            "wif": "WIF", "dogwifhat": "WIF",
-            "pepe": "PEPE"
-        }
-        
-        coins = []
-        for pattern, coin in coin_map.items():
-            if pattern in message_lower and coin not in coins:
-                coins.append(coin)
-        
-        return coins
+        """Detect coin symbols from message, in order of first mention."""
+        coins = dict.fromkeys(
+            self._COIN_SYMBOLS[name] for name in self._COIN_PATTERN.findall(message.lower())
+        )
+        return list(coins)
     
     def _get_cached(self, market: str) -> Optional[Dict]:
         """Get cached data if still valid."""
-        if market in self._cache:
-            cached = self._cache[market]
-            cached_at_str = cached.get("_cached_at", "1970-01-01T00:00:00")
-            try:
-                cached_at = datetime.fromisoformat(cached_at_str)
-                age = (datetime.utcnow() - cached_at).total_seconds()
-                if age < self._cache_ttl:
-                    # Return without the _cached_at field to avoid serialization issues
-                    result = {k: v for k, v in cached.items() if not k.startswith("_")}
-                    return result
-            except:
-                pass
-        return None
+        return self._cache.get(market)
     
     def _set_cache(self, market: str, data: Dict):
         """Cache market data."""
-        data["_cached_at"] = datetime.utcnow().isoformat()
-        self._cache[market] = data
-
+        self._cache.set(market, data)
 
 # Singleton instance
 market_data_agent = MarketDataAgent()
@@ -6,10 +6,13 @@ and how to combine their results into a coherent response.
 import json
 import logging
 import asyncio
+import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from app.agents.base_agent import BaseAgent, AgentContext, AgentResult
+from app.agents.base_agent import BaseAgent, AgentContext, AgentResult, compile_triggers, match_triggers
+from app.agents.llm_agent import MARKET_KEYWORDS, WORD_PATTERN, classify_local_route, get_openai_client, llm_semaphore
+from app.agents.llm_cache import ResponseCache
 from app.agents.market_data_agent import market_data_agent
 from app.agents.sentiment_agent import sentiment_agent
 from app.agents.portfolio_agent import portfolio_agent
@@ -18,6 +21,68 @@ from app.config import get_settings
 logger = logging.getLogger(__name__)
 
 
+# Keywords for the no-LLM fallback router, one group per agent
+SIMPLE_ROUTING_KEYWORDS = compile_triggers({
+    "market_data": ["price", "worth", "cost", "how much"],
+    "sentiment": ["news", "why", "sentiment", "happening", "should"],
+    "portfolio": ["rule", "agent", "trade", "position", "executed"],
+})
+
+# Agent for each intent the local router can settle on its own
+LOCAL_ROUTE_AGENTS = {"price_query": "market_data", "position_query": "portfolio"}
+
+# Words that turn a price lookup into a request for advice, which also needs
+# market_analysis/sentiment; those messages still go to the LLM router
+PRICE_ADVICE_WORDS = frozenset({
+    "worth", "buying", "selling", "prediction", "predictions", "forecast", "target",
+    "targets", "invest", "investing", "hold", "holding", "good", "bad", "safe", "expect",
+})
+
+# Simple routing at or above this confidence skips the LLM routing call
+SIMPLE_ROUTING_MIN_CONFIDENCE = 0.9
+
+
+# Routing depends on the shape of a message, not on which coin or number it names,
+# so "sol price" and "btc price" share one cached decision. Words are Unicode; a word
+# runs on through non-ASCII characters so combining vowel signs (e.g. Devanagari) stay attached.
+ROUTING_TOKEN_PATTERN = re.compile(r"\d+(?:[.,]\d+)*|[^\W\d_](?:\w|[^\s\x00-\x7f])*")
+
+
+def _routing_cache_key(message: str) -> Optional[str]:
+    """Normalise a message to its routing shape: words, with coins and numbers as placeholders.
+
+    Returns None when the message has no words (emoji or punctuation only), so
+    unrelated messages never share a cached decision.
+    """
+    tokens = [
+        "<n>" if token[0].isdigit() else "<coin>" if token in MARKET_KEYWORDS else token
+        for token in ROUTING_TOKEN_PATTERN.findall(message.lower())
+    ]
+    if all(token == "<n>" for token in tokens):
+        return None
+    return " ".join(tokens)
+
+
+# Status markers for the no-LLM summary in _combine_results_simple
+TREND_EMOJI = {"bullish": "📈", "bearish": "📉"}
+RULE_STATUS_EMOJI = {"active": "🟢", "paused": "⏸️", "triggered": "✅", "expired": "⏹️"}
+TRADE_STATUS_EMOJI = {"filled": "✅", "failed": "❌"}
+
+
+def _drop_nulls(value: Any) -> Any:
+    """Recursively drop None-valued keys; a missing key tells the LLM as much as a null."""
+    if isinstance(value, dict):
+        return {k: _drop_nulls(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_drop_nulls(v) for v in value]
+    return value
+
+
+def _compact_json(data: Any) -> str:
+    """Agent data for the combine prompt: no indentation or nulls, to save input tokens."""
+    return json.dumps(_drop_nulls(data), separators=(",", ":"), default=str)
+
+
 # Prompt for orchestrator to decide which agents to use
 ORCHESTRATOR_ROUTING_PROMPT = """You are an orchestrator for a crypto trading bot. Analyze the user's request and decide:
 1. Which specialized agents to invoke
@@ -124,6 +189,8 @@ class OrchestratorAgent(BaseAgent):
     def __init__(self):
         super().__init__("orchestrator")
         self.settings = get_settings()
+        # LLM routing decisions by message shape; see _routing_cache_key
+        self._routing_cache = ResponseCache(ttl_seconds=300, max_size=2048)
         
         # Register available agents
         self.agents = {
@@ -144,16 +211,25 @@ class OrchestratorAgent(BaseAgent):
         3. Combine results using LLM
         4. Return final response
         """
+        prefetched: Dict[str, "asyncio.Task[AgentResult]"] = {}
         try:
-            # Step 1: Decide which agents to invoke
-            routing_decision = await self._decide_routing(context)
+            # Step 1: Decide which agents to invoke, asking the LLM only when keywords aren't conclusive
+            routing_decision = None
+            if self.settings.orchestrator_skip_llm_routing:
+                routing_decision = self._simple_routing(context)
+                if routing_decision["confidence"] < SIMPLE_ROUTING_MIN_CONFIDENCE:
+                    routing_decision = None
+            if routing_decision is None:
+                # Most routes include market_data, so fetch it while the LLM decides
+                prefetched["market_data"] = asyncio.create_task(market_data_agent._execute_with_timing(context))
+                routing_decision = await self._decide_routing(context)
             logger.info(f"Routing decision: {routing_decision}")
             
             # Step 2: Run selected agents
             agents_to_run = routing_decision.get("agents_to_invoke", ["market_data"])
             run_parallel = routing_decision.get("parallel", True)
             
-            agent_results = await self._run_agents(agents_to_run, context, run_parallel)
+            agent_results = await self._run_agents(agents_to_run, context, run_parallel, prefetched)
             
             # Step 3: Combine results
             needs_analysis = routing_decision.get("needs_analysis", True)
@@ -183,71 +259,81 @@ class OrchestratorAgent(BaseAgent):
                 success=False,
                 error=str(e)
             )
+        finally:
+            # A speculative fetch the route never used must not outlive the request
+            for task in prefetched.values():
+                task.cancel()
     
     async def _decide_routing(self, context: AgentContext) -> Dict[str, Any]:
         """Use LLM to decide which agents to invoke."""
-        from app.agents.llm_agent import get_openai_client
-        
-        client, model, http_client = await get_openai_client()
+        cache_key = _routing_cache_key(context.user_message)
+        cached = self._routing_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            return dict(cached)
         
         try:
-            response = await client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": ORCHESTRATOR_ROUTING_PROMPT},
-                    {"role": "user", "content": f"User message: {context.user_message}"}
-                ],
-                temperature=0.1,
-                max_tokens=300
-            )
+            client, model, _ = await get_openai_client()
+            async with llm_semaphore:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": ORCHESTRATOR_ROUTING_PROMPT},
+                        {"role": "user", "content": f"User message: {context.user_message}"}
+                    ],
+                    temperature=0.1,
+                    max_tokens=300,
+                    # JSON mode: the reply is a bare JSON object, never wrapped in markdown
+                    response_format={"type": "json_object"}
+                )
             
             content = response.choices[0].message.content
             
-            # Parse JSON from response
             try:
-                # Try direct parse
                 decision = json.loads(content)
             except json.JSONDecodeError:
-                # Try to extract JSON from markdown
-                import re
-                json_match = re.search(r'```(?:json)?\s*(.*?)\s*```', content, re.DOTALL)
-                if json_match:
-                    decision = json.loads(json_match.group(1))
-                else:
-                    # Fallback
-                    decision = {
-                        "agents_to_invoke": ["market_data"],
-                        "reason": "Default routing",
-                        "parallel": True,
-                        "needs_analysis": True
-                    }
+                # e.g. cut off at max_tokens; fall back to the default route
+                return {
+                    "agents_to_invoke": ["market_data"],
+                    "reason": "Default routing",
+                    "parallel": True,
+                    "needs_analysis": True
+                }
             
-            return decision
+            # Rule creation carries the exact user input, so only reuse other decisions
+            if cache_key is not None and not decision.get("should_create_rule"):
+                self._routing_cache.set(cache_key, decision)
+            return dict(decision)
             
         except Exception as e:
             logger.error(f"Routing decision failed: {e}")
             # Fallback to simple routing
             return self._simple_routing(context)
-        finally:
-            await http_client.aclose()
     
     def _simple_routing(self, context: AgentContext) -> Dict[str, Any]:
-        """Fallback simple routing without LLM."""
-        message = context.user_message.lower()
-        
-        agents = []
-        
-        # Price queries
-        if any(kw in message for kw in ["price", "worth", "cost", "how much"]):
-            agents.append("market_data")
+        """Route without the LLM; "confidence" says whether the keywords alone settle it."""
+        # Plain price/position lookups (no rule, trade or period words) are unambiguous;
+        # a price lookup also has to name a coin and must not ask for advice
+        lower_message = context.user_message.lower().strip()
+        local_intent = classify_local_route(lower_message)
+        if local_intent is not None and local_intent.intent == "price_query" and (
+            local_intent.market is None or not PRICE_ADVICE_WORDS.isdisjoint(WORD_PATTERN.findall(lower_message))
+        ):
+            local_intent = None
+        if local_intent is not None and local_intent.intent in LOCAL_ROUTE_AGENTS:
+            return {
+                "agents_to_invoke": [LOCAL_ROUTE_AGENTS[local_intent.intent]],
+                "intent": local_intent.intent,
+                "should_create_rule": False,
+                "reason": "Local keyword routing",
+                "parallel": True,
+                "needs_analysis": True,
+                "confidence": local_intent.confidence
+            }
         
-        # Sentiment queries
-        if any(kw in message for kw in ["news", "why", "sentiment", "happening", "should"]):
-            agents.append("sentiment")
+        matched = match_triggers(SIMPLE_ROUTING_KEYWORDS, context.user_message.lower())
         
-        # Portfolio queries
-        if any(kw in message for kw in ["rule", "agent", "trade", "position", "executed"]):
-            agents.append("portfolio")
+        # Keep a stable agent order: price, sentiment, then portfolio
+        agents = [name for name in ("market_data", "sentiment", "portfolio") if name in matched]
         
         # Default to market_data
         if not agents:
@@ -257,47 +343,58 @@ class OrchestratorAgent(BaseAgent):
             "agents_to_invoke": agents,
             "reason": "Simple keyword routing",
             "parallel": True,
-            "needs_analysis": True
+            "needs_analysis": True,
+            "confidence": 0.4
         }
     
     async def _run_agents(
         self, 
         agent_names: List[str], 
         context: AgentContext,
-        parallel: bool = True
+        parallel: bool = True,
+        prefetched: Optional[Dict[str, "asyncio.Task[AgentResult]"]] = None
     ) -> Dict[str, AgentResult]:
-        """Run selected agents, optionally in parallel."""
+        """Run selected agents, optionally in parallel.
+        
+        Agents with a task in ``prefetched`` (started speculatively) reuse it instead
+        of running again; prefetched tasks for agents that weren't selected are cancelled.
+        """
         results = {}
+        prefetched = prefetched or {}
         
-        # Filter to only available agents
-        available_agents = [n for n in agent_names if n in self.agents]
+        # Filter to only available agents; the router sometimes repeats one, so dedupe in order
+        available_agents = [n for n in dict.fromkeys(agent_names) if n in self.agents]
         
         if not available_agents:
             available_agents = ["market_data"]
         
-        if parallel and len(available_agents) > 1:
-            # Run in parallel
-            tasks = []
-            for name in available_agents:
-                agent = self.agents[name]
-                tasks.append(agent._execute_with_timing(context))
-            
-            agent_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for name, result in zip(available_agents, agent_results):
-                if isinstance(result, Exception):
-                    results[name] = AgentResult(
-                        agent_name=name,
-                        success=False,
-                        error=str(result)
-                    )
-                else:
-                    results[name] = result
-        else:
-            # Run sequentially
-            for name in available_agents:
-                agent = self.agents[name]
-                results[name] = await agent._execute_with_timing(context)
+        def run(name: str):
+            return prefetched.pop(name, None) or self.agents[name]._execute_with_timing(context)
+        
+        try:
+            if parallel and len(available_agents) > 1:
+                # Run in parallel
+                agent_results = await asyncio.gather(
+                    *(run(name) for name in available_agents),
+                    return_exceptions=True
+                )
+                
+                for name, result in zip(available_agents, agent_results):
+                    if isinstance(result, Exception):
+                        results[name] = AgentResult(
+                            agent_name=name,
+                            success=False,
+                            error=str(result)
+                        )
+                    else:
+                        results[name] = result
+            else:
+                # Run sequentially
+                for name in available_agents:
+                    results[name] = await run(name)
+        finally:
+            for task in prefetched.values():
+                task.cancel()
         
         return results
     
@@ -308,14 +405,12 @@ class OrchestratorAgent(BaseAgent):
         routing_decision: Dict
     ) -> str:
         """Use LLM to combine agent results into natural response."""
-        from app.agents.llm_agent import get_openai_client
-        
         # Build agent data summary
         agent_data_parts = []
         
         for name, result in agent_results.items():
             if result.success:
-                agent_data_parts.append(f"## {name.upper()} Agent:\n{json.dumps(result.data, indent=2, default=str)}")
+                agent_data_parts.append(f"## {name.upper()} Agent:\n{_compact_json(result.data)}")
             else:
                 agent_data_parts.append(f"## {name.upper()} Agent: FAILED - {result.error}")
         
@@ -326,25 +421,23 @@ class OrchestratorAgent(BaseAgent):
             user_message=context.user_message
         )
         
-        client, model, http_client = await get_openai_client()
-        
         try:
-            response = await client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1200
-            )
+            client, model, _ = await get_openai_client()
+            async with llm_semaphore:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=1200
+                )
             
             return response.choices[0].message.content
             
         except Exception as e:
             logger.error(f"Combine results failed: {e}")
             return self._combine_results_simple(agent_results)
-        finally:
-            await http_client.aclose()
     
     def _combine_results_simple(self, agent_results: Dict[str, AgentResult]) -> str:
         """Simple combination without LLM."""
@@ -356,11 +449,11 @@ class OrchestratorAgent(BaseAgent):
                 
                 if name == "market_data" and "markets" in data:
                     for market, mdata in data["markets"].items():
-                        price = mdata.get("current_price", 0)
-                        trend = mdata.get("trend", "neutral")
-                        change = mdata.get("price_change_7d", 0)
+                        # Fields are present but None when a fetch failed
+                        price = mdata.get("current_price") or 0
+                        change = mdata.get("price_change_7d") or 0
                         
-                        emoji = "📈" if trend == "bullish" else "📉" if trend == "bearish" else "➡️"
+                        emoji = TREND_EMOJI.get(mdata.get("trend"), "➡️")
                         parts.append(f"{emoji} **{market}**: ${price:,.2f} ({change:+.2f}% 7d)")
                 
                 if name == "sentiment" and "coins" in data:
@@ -381,7 +474,7 @@ class OrchestratorAgent(BaseAgent):
                         parts.append("📋 **Your Trading Rules:**\n")
                         for r in rules[:10]:  # Limit to 10
                             status = r.get("status", "unknown")
-                            status_emoji = {"active": "🟢", "paused": "⏸️", "triggered": "✅", "expired": "⏹️"}.get(status, "❓")
+                            status_emoji = RULE_STATUS_EMOJI.get(status, "❓")
                             market = r.get("market", "")
                             summary = r.get("parsed_summary") or r.get("user_input", "")
                             parts.append(f"{status_emoji} **{market}**: {summary}")
@@ -392,7 +485,7 @@ class OrchestratorAgent(BaseAgent):
                         parts.append("\n📊 **Recent Trades:**")
                         for t in trades[:5]:  # Limit to 5
                             status = t.get("status", "unknown")
-                            status_emoji = "✅" if status == "filled" else "❌" if status == "failed" else "⏳"
+                            status_emoji = TRADE_STATUS_EMOJI.get(status, "⏳")
                             market = t.get("market", "")
                             side = t.get("side", "")
                             price = t.get("price", 0)
@@ -9,7 +9,9 @@ from datetime import datetime
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agents.base_agent import BaseAgent, AgentContext, AgentResult, AgentCapability
+from app.agents.base_agent import (
+    BaseAgent, AgentContext, AgentResult, AgentCapability, compile_triggers, match_triggers
+)
 from app.database import async_session_maker
 from app.models import TradingRule, Trade, RuleStatus
 
@@ -34,25 +36,23 @@ class PortfolioAgent(BaseAgent):
         can_run_parallel=True
     )
     
+    # Rule/trade keywords are high confidence, portfolio keywords lower
+    _KEYWORDS = compile_triggers({
+        "rule": ["rule", "rules", "agent", "agents"],
+        "trade": ["trade", "trades", "executed", "position", "positions"],
+        "portfolio": ["my", "portfolio", "history", "show me"],
+    })
+    
     def __init__(self):
         super().__init__("portfolio")
     
     def can_handle(self, context: AgentContext) -> float:
         """Check if this agent should handle the request."""
-        message = context.user_message.lower()
-        
-        # High confidence triggers
-        rule_keywords = ["rule", "rules", "agent", "agents"]
-        trade_keywords = ["trade", "trades", "executed", "position", "positions"]
-        portfolio_keywords = ["my", "portfolio", "history", "show me"]
-        
-        has_rule_kw = any(kw in message for kw in rule_keywords)
-        has_trade_kw = any(kw in message for kw in trade_keywords)
-        has_portfolio_kw = any(kw in message for kw in portfolio_keywords)
+        matched = match_triggers(self._KEYWORDS, context.user_message.lower())
         
-        if has_rule_kw or has_trade_kw:
+        if "rule" in matched or "trade" in matched:
             return 0.9
-        elif has_portfolio_kw:
+        elif matched:
             return 0.7
         return 0.1
     
@@ -7,7 +7,9 @@ import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from app.agents.base_agent import BaseAgent, AgentContext, AgentResult, AgentCapability
+from app.agents.base_agent import (
+    BaseAgent, AgentContext, AgentResult, AgentCapability, compile_triggers, match_triggers
+)
 from app.services.web_search_service import web_search_service
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,12 @@ class SentimentAgent(BaseAgent):
         can_run_parallel=True
     )
     
+    # Sentiment keywords are high confidence, analysis keywords lower
+    _KEYWORDS = compile_triggers({
+        "sentiment": ["news", "sentiment", "why", "reason", "happening", "update", "latest"],
+        "analysis": ["analysis", "predict", "forecast", "outlook", "situation", "should i"],
+    })
+    
     def __init__(self):
         super().__init__("sentiment")
         self._cache: Dict[str, Dict] = {}
@@ -37,18 +45,11 @@ class SentimentAgent(BaseAgent):
     
     def can_handle(self, context: AgentContext) -> float:
         """Check if this agent should handle the request."""
-        message = context.user_message.lower()
-        
-        # High confidence triggers
-        sentiment_keywords = ["news", "sentiment", "why", "reason", "happening", "update", "latest"]
-        analysis_keywords = ["analysis", "predict", "forecast", "outlook", "situation", "should i"]
-        
-        has_sentiment_kw = any(kw in message for kw in sentiment_keywords)
-        has_analysis_kw = any(kw in message for kw in analysis_keywords)
+        matched = match_triggers(self._KEYWORDS, context.user_message.lower())
         
-        if has_sentiment_kw:
+        if "sentiment" in matched:
             return 0.85
-        elif has_analysis_kw:
+        elif matched:
             return 0.7
         return 0.2
     
@@ -347,27 +347,26 @@ async def get_conversation_stats(db: AsyncSession, conversation_id: int) -> Conv
 async def generate_title_from_message(message: str) -> str:
     """Generate a short, descriptive title from the first message using AI."""
     try:
-        from app.agents.llm_agent import get_openai_client
+        from app.agents.llm_agent import get_openai_client, llm_semaphore
         
-        client, model, http_client = await get_openai_client()
+        client, model, _ = await get_openai_client()
         
-        response = await client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Generate a very short title (3-5 words max) for this chat conversation. No quotes, no punctuation at the end. Just the title text. Examples: 'Buy SOL strategy', 'ETH price check', 'Portfolio balance query'"
-                },
-                {
-                    "role": "user", 
-                    "content": message
-                }
-            ],
-            max_tokens=20,
-            temperature=0.3
-        )
-        
-        await http_client.aclose()
+        async with llm_semaphore:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Generate a very short title (3-5 words max) for this chat conversation. No quotes, no punctuation at the end. Just the title text. Examples: 'Buy SOL strategy', 'ETH price check', 'Portfolio balance query'"
+                    },
+                    {
+                        "role": "user", 
+                        "content": message
+                    }
+                ],
+                max_tokens=20,
+                temperature=0.3
+            )
         
         title = response.choices[0].message.content.strip()
         # Remove quotes if AI added them
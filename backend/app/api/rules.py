@@ -7,7 +7,7 @@ from datetime import datetime
 
 from app.database import get_db
 from app.models import TradingRule, JobLog, Trade, RuleStatus, ConditionType
-from app.agents import llm_agent
+from app.agents.llm_agent import llm_agent
 from app.services import drift_service
 from app.jobs import job_scheduler
 
@@ -47,6 +47,15 @@ class Settings(BaseSettings):
     groq_model: str = "llama-3.3-70b-versatile"  # or mixtral-8x7b-32768, llama3-8b-8192
     use_groq: bool = True  # Will only work if groq_api_key is set
     
+    # Max concurrent outbound LLM requests per process
+    llm_max_concurrency: int = 8
+    
+    # Give up on the LLM intent router after this long and fall back to general chat
+    llm_router_timeout_seconds: float = 2.0
+    
+    # Let the orchestrator route unambiguous price/position questions without an LLM call
+    orchestrator_skip_llm_routing: bool = True
+    
     # Legacy GitHub proxy settings
     github_proxy_url: str = "http://127.0.0.1:8080/v1"
     use_github_proxy: bool = False
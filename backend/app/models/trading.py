@@ -1,8 +1,27 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Enum, ForeignKey, Float, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Enum, ForeignKey, Float, Text, Index, LargeBinary, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from app.database import Base
 import enum
+import msgpack
+import zstandard
+
+
+class CompressedMsgpack(TypeDecorator):
+    """JSON-compatible value stored as zstd-compressed msgpack in a binary column."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zstandard.compress(msgpack.packb(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return msgpack.unpackb(zstandard.decompress(value))
 
 
 class RuleStatus(str, enum.Enum):
@@ -71,10 +90,18 @@ class ChatMessage(Base):
 
 class TradingRule(Base):
     __tablename__ = "trading_rules"
+    __table_args__ = (
+        Index("ix_trading_rules_wallet_status", "wallet_address", "status"),
+        Index(
+            "ix_trading_rules_active", "market", "wallet_address",
+            sqlite_where=text("status = 'active'"),
+            postgresql_where=text("status = 'active'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=True)  # Link to conversation
-    wallet_address = Column(String, index=True, nullable=True)  # Bind rule to wallet
+    wallet_address = Column(String, nullable=True)  # Bind rule to wallet
     
     user_input = Column(String, nullable=False)  # Original natural language input
     parsed_summary = Column(String)  # Human-readable summary of parsed rule
@@ -94,7 +121,7 @@ class TradingRule(Base):
     status = Column(Enum(RuleStatus, values_callable=lambda x: [e.value for e in x]), default=RuleStatus.ACTIVE)
     
     # Analysis data - stores historical data, predictions, market analysis when rule was created
-    analysis_data = Column(JSON, nullable=True)
+    analysis_data = Column(CompressedMsgpack, nullable=True)
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -111,7 +138,7 @@ class JobLog(Base):
     __tablename__ = "job_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    rule_id = Column(Integer, ForeignKey("trading_rules.id"), nullable=False)
+    rule_id = Column(Integer, ForeignKey("trading_rules.id"), nullable=False, index=True)
 
     # Log details
     checked_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -126,10 +153,13 @@ class JobLog(Base):
 
 class Trade(Base):
     __tablename__ = "trades"
+    __table_args__ = (
+        Index("ix_trades_wallet_status", "wallet_address", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    rule_id = Column(Integer, ForeignKey("trading_rules.id"))
-    wallet_address = Column(String, index=True, nullable=True)  # Bind trade to wallet
+    rule_id = Column(Integer, ForeignKey("trading_rules.id"), index=True)
+    wallet_address = Column(String, nullable=True)  # Bind trade to wallet
 
     # Trade details
     market = Column(String, nullable=False)
@@ -151,11 +181,14 @@ class Trade(Base):
 
 class PriceSnapshot(Base):
     __tablename__ = "price_snapshots"
+    __table_args__ = (
+        Index("ix_price_snapshots_market_ts", "market", text("timestamp DESC"), "price"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    market = Column(String, nullable=False, index=True)
+    market = Column(String, nullable=False)
     price = Column(Float, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class PendingTradeStatus(str, enum.Enum):
@@ -169,10 +202,18 @@ class PendingTradeStatus(str, enum.Enum):
 class PendingTrade(Base):
     """Trades that need user approval before execution."""
     __tablename__ = "pending_trades"
+    __table_args__ = (
+        Index("ix_pending_trades_wallet_status", "wallet_address", "status"),
+        Index(
+            "ix_pending_trades_wallet_pending", "wallet_address",
+            sqlite_where=text("status = 'pending'"),
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    rule_id = Column(Integer, ForeignKey("trading_rules.id"), nullable=True)
-    wallet_address = Column(String, index=True, nullable=False)
+    rule_id = Column(Integer, ForeignKey("trading_rules.id"), nullable=True, index=True)
+    wallet_address = Column(String, nullable=False)
 
     # Trade details
     market = Column(String, nullable=False)
@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 # CoinGecko API base URL (free tier, no API key required)
 COINGECKO_API_BASE = "https://api.coingecko.com/api/v3"
 
+# Located once; certifi.where() resolves the bundle path on every call
+CA_BUNDLE = certifi.where()
+
 # Mapping from market symbols to CoinGecko IDs
 MARKET_TO_COINGECKO_ID = {
     "SOL-PERP": "solana",
@@ -96,7 +99,7 @@ async def get_historical_prices(
         return _price_cache[cache_key]["data"]
     
     try:
-        async with httpx.AsyncClient(timeout=30.0, verify=certifi.where()) as client:
+        async with httpx.AsyncClient(timeout=30.0, verify=CA_BUNDLE) as client:
             response = await client.get(
                 f"{COINGECKO_API_BASE}/coins/{coin_id}/market_chart",
                 params={
@@ -211,7 +214,7 @@ async def get_ohlc_data(
     coin_id = MARKET_TO_COINGECKO_ID.get(market.upper(), market.lower())
     
     try:
-        async with httpx.AsyncClient(timeout=30.0, verify=certifi.where()) as client:
+        async with httpx.AsyncClient(timeout=30.0, verify=CA_BUNDLE) as client:
             response = await client.get(
                 f"{COINGECKO_API_BASE}/coins/{coin_id}/ohlc",
                 params={
@@ -301,7 +304,7 @@ async def get_current_price_with_history(
     coin_id = MARKET_TO_COINGECKO_ID.get(market.upper(), market.lower())
     
     try:
-        async with httpx.AsyncClient(timeout=30.0, verify=certifi.where()) as client:
+        async with httpx.AsyncClient(timeout=30.0, verify=CA_BUNDLE) as client:
             response = await client.get(
                 f"{COINGECKO_API_BASE}/coins/{coin_id}",
                 params={
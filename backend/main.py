@@ -11,6 +11,7 @@ from app.api.pending_trades import router as pending_trades_router
 from app.database import init_db
 from app.jobs import job_scheduler
 from app.services import drift_service
+from app.agents.llm_agent import llm_agent
 from app.config import get_settings
 
 settings = get_settings()
@@ -51,6 +52,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     job_scheduler.stop()
     await drift_service.close()
+    await llm_agent.close()
 
 
 # Create FastAPI app